@@ -15,10 +15,11 @@ from pyzo.util.qt import QtCore, QtGui, QtWidgets
 from .tree import (
     PyUNOWorkspaceTree,
     PyUNOWorkspaceProxy,
+    PyUNOContainerCombo,
+    PyUNONameCompleter,
     writeHistory,
     readHistory,
     getHistoryFilePath,
-    createResultFile,
     createHistoryFile,
 )
 
@@ -62,6 +63,21 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
             else:
                 self._config.fontSizeHelp = 10
         #
+        if not hasattr(self._config, "containerPageSize"):
+            self._config.containerPageSize = 200
+        # time budget to read one property, in ms, 0 is no budget
+        if not hasattr(self._config, "propertyTimeout"):
+            self._config.propertyTimeout = 500
+        # shortest time between refreshes after code ran, in ms
+        if not hasattr(self._config, "refreshInterval"):
+            self._config.refreshInterval = 1000
+        # memory budget of the snapshots of recent names, in KB
+        if not hasattr(self._config, "snapshotBudget"):
+            self._config.snapshotBudget = 4096
+        # auto, introspection or reflection
+        if not hasattr(self._config, "inspectionEngine"):
+            self._config.inspectionEngine = "auto"
+        #
         if not hasattr(self._config, "historyMaximum"):
             self._config.historyMaximum = 10
         # if not hasattr(self._config, "historyFreeze"):
@@ -93,12 +109,26 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         self._refresh.setIconSize(QtCore.QSize(16, 16))
         self._refresh.setToolTip("Reload the current command.")
 
+        # Create Watch tool button
+        self._watch = QtWidgets.QToolButton(self)
+        self._watch.setIcon(style.standardIcon(style.SP_MediaPlay))
+        self._watch.setIconSize(QtCore.QSize(16, 16))
+        self._watch.setToolTip("Watch the properties while code runs.")
+        self._watch.setCheckable(True)
+
         # Create Go back tool button
         self.back = QtWidgets.QToolButton(self)
         self.back.setIcon(style.standardIcon(style.SP_ArrowLeft))
         self.back.setIconSize(QtCore.QSize(16, 16))
         self.back.setToolTip("Go back to the previous command.")
 
+        # Create Go forward tool button
+        self.forward = QtWidgets.QToolButton(self)
+        self.forward.setIcon(style.standardIcon(style.SP_ArrowRight))
+        self.forward.setIconSize(QtCore.QSize(16, 16))
+        self.forward.setToolTip("Go forward to the command left by going back.")
+        self.forward.setEnabled(False)
+
         # Create "path" line edit
         self._line = QtWidgets.QLineEdit(self)
         self._line.setReadOnly(True)
@@ -124,20 +154,28 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         # ----- Layout 2 -----
 
         # Create element_index combo box
-        self._element_index = QtWidgets.QComboBox(self)
+        self._element_index = PyUNOContainerCombo(self, "getByIndex", "--Index--")
         self._element_index.setToolTip("Set the argument for getByIndex method.")
         self._element_index.setEnabled(False)
 
         # Create element_names combo box
-        self._element_names = QtWidgets.QComboBox(self)
+        self._element_names = PyUNOContainerCombo(self, "getByName", "--Name--")
         self._element_names.setToolTip("Get by name")
         self._element_names.setEnabled(False)
 
         # Create enumerate combo box
-        self._enumerate_index = QtWidgets.QComboBox(self)
+        self._enumerate_index = PyUNOContainerCombo(
+            self, "createEnumeration", "--Enumeration--", ["All"]
+        )
         self._enumerate_index.setToolTip("Objects enumerated by createEnumeration method")
         self._enumerate_index.setEnabled(False)
 
+        # Create filter line edit
+        self._filter = QtWidgets.QLineEdit(self)
+        self._filter.setPlaceholderText("Filter...")
+        self._filter.setToolTip("Show only the names containing this text.")
+        self._filter.setClearButtonEnabled(True)
+
         # Create history combo box
         self._history = QtWidgets.QComboBox(self)
         self._history.setToolTip("Show the command history")
@@ -159,6 +197,11 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         self._font_size_tree_menu = pyzo.core.menu.Menu(None, "Workspace")
         self._font_size_help_menu = pyzo.core.menu.Menu(None, "Help")
         #
+        self._property_timeout_menu = pyzo.core.menu.Menu(None, "Property timeout")
+        self._engine_menu = pyzo.core.menu.Menu(None, "Engine")
+        self._snapshot_menu = pyzo.core.menu.Menu(None, "Snapshot cache")
+        self._refresh_menu = pyzo.core.menu.Menu(None, "Refresh rate")
+        #
         self._history_menu = pyzo.core.menu.Menu(None, "History")
 
         # create menu
@@ -235,7 +278,9 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         layout_1 = QtWidgets.QHBoxLayout()
         layout_1.addWidget(self._home, 0)
         layout_1.addWidget(self._refresh, 0)
+        layout_1.addWidget(self._watch, 0)
         layout_1.addWidget(self.back, 0)
+        layout_1.addWidget(self.forward, 0)
         layout_1.addWidget(self._line, 1)
         layout_1.addWidget(self._selection, 0)
         layout_1.addWidget(self._insert_code, 0)
@@ -245,6 +290,7 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         layout_2.addWidget(self._element_index, 0)
         layout_2.addWidget(self._element_names, 0)
         layout_2.addWidget(self._enumerate_index, 0)
+        layout_2.addWidget(self._filter, 0)
         layout_2.addWidget(self._history, 1)
         layout_2.addWidget(self._options, 0)
         layout_2.addWidget(self._btn_toggle, 0)
@@ -297,15 +343,18 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         # ------ Bind events
         self._home.pressed.connect(self.onHomePress)
         self._refresh.pressed.connect(self.onRefreshPress)
+        self._watch.toggled.connect(self.onWatchToggled)
         self.back.pressed.connect(self.onBackPress)
+        self.forward.pressed.connect(self.onForwardPress)
         #
         self._selection.pressed.connect(self.onCurrentSelectionPress)
         self._insert_code.pressed.connect(self.onInsertCodeInEditorPress)
         #
-        self._element_names.activated[str].connect(self.onElementNamesPress)
-        self._element_index.activated[str].connect(self.onElementIndexPress)
-        self._enumerate_index.activated[str].connect(self.onEnumerateIndexPress)
+        self._element_names.elementActivated.connect(self.onElementNamesPress)
+        self._element_index.elementActivated.connect(self.onElementIndexPress)
+        self._enumerate_index.elementActivated.connect(self.onEnumerateIndexPress)
         self._history.activated[str].connect(self.onHistoryPress)
+        self._filter.textChanged.connect(self._tree.setFilterText)
         #
         self._options.pressed.connect(self.onOptionsPress)
         #
@@ -317,14 +366,27 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
             self.onFontTreeOptionMenuTiggered
         )
         self._history_menu.triggered.connect(self.onHistoryOptionMenuTiggered)
+        self._property_timeout_menu.triggered.connect(
+            self.onPropertyTimeoutMenuTiggered
+        )
+        self._engine_menu.triggered.connect(self.onEngineMenuTiggered)
+        self._snapshot_menu.triggered.connect(self.onSnapshotMenuTiggered)
+        self._refresh_menu.triggered.connect(self.onRefreshMenuTiggered)
         #
         self._btn_toggle.toggled.connect(self.onHelpTogglePress)
         #
         self._search.pressed.connect(self.onSearchPress)
         self._clear.pressed.connect(self.onClearHelpPress)
+        #
+        self._tree._proxy.haveStatistics.connect(self.onStatistics)
 
-        # Create json result file
-        createResultFile(),
+        # Search-as-you-type completion
+        self._search_completer = PyUNONameCompleter(
+            self._search_line, self.getAPINameIndex
+        )
+        self._filter_completer = PyUNONameCompleter(
+            self._filter, self._tree.nameIndex
+        )
 
         # Load History
         if self._config.historyClearOnStartup:
@@ -389,14 +451,20 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         """ Back to start """
 
         self.onClearHelpPress()
+        self._tree._proxy.invalidate()
         self._tree._proxy.setName("")
 
     def onRefreshPress(self):
         """ Refresh """
         self.onClearHelpPress()
         line = self._line.text()
+        self._tree._proxy.invalidate()
         self._tree._proxy.setName(line)
 
+    def onWatchToggled(self, checked):
+        """ Watch properties """
+        self._tree._proxy.setWatching(checked)
+
     def onBackPress(self):
         """ Go back """
         self.onClearHelpPress()
@@ -406,6 +474,11 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         else:
             self._tree._proxy.setName("")
 
+    def onForwardPress(self):
+        """ Go forward """
+        self.onClearHelpPress()
+        self._tree._proxy.goForward()
+
     def onCurrentSelectionPress(self):
         """ Get selected object """
         line = self._line.text()
@@ -444,7 +517,9 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         """ Create enumeration """
         element = self._enumerate_index.currentText()
         line = self._line.text()
-        if element == "All":
+        if element == "--Enumeration--":
+            return
+        elif element == "All":
             new_line = "list(" + line + ")"
             self._tree._proxy.setName(new_line)
         else:
@@ -470,9 +545,19 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
 
     # Layout 5
 
+    def getAPINameIndex(self):
+        """ Prefix index of the UNO API names, loaded once """
+        from .unodoc import getConnection, getNameIndex
+
+        try:
+            return getNameIndex(getConnection())
+        except Exception as err:
+            print("UNO API names: ", err)
+            return None
+
     def onSearchPress(self):
-        """ Search UNO API """
-        from .tree import conn, formatReference
+        """ Search UNO API, the search runs in a worker """
+        from .unodoc import renderSearch
 
         self._description.clear()
         self._desc_counter.setText("0")
@@ -480,33 +565,120 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
 
         search = self._search_line.text()
         if search:
-            cur = conn.cursor()
+            self._tree._docs.request(
+                renderSearch,
+                search,
+                self._match.isChecked(),
+                callback=self.onSearchResponse,
+            )
 
-            if self._match.isChecked():
-                cur.execute(
-                    "SELECT signature, description, reference FROM UNOtable WHERE  name=?",
-                    [search],
-                )
-            else:
-                cur.execute(
-                    "SELECT signature, description, reference FROM UNOtable WHERE  name like ?",
-                    ("%" + search + "%",),
+    def onSearchResponse(self, result):
+        """ Show UNO API search results """
+        if result is None:
+            return
+        res, n = result
+        self._description.setText(res)
+        self._desc_all_items.setText(str(n))
+
+    def onStatisticsPress(self):
+        """ Ask for inspection service statistics """
+        self._tree._proxy.requestStatistics()
+
+    def onStatistics(self, stats):
+        """ Show inspection service statistics """
+        cache = stats.get("schema_cache", {})
+        size = cache.get("size", 0)
+        maxsize = cache.get("maxsize", 0)
+        hits = cache.get("hits", 0)
+        lookups = hits + cache.get("misses", 0)
+        rate = 100.0 * hits / lookups if lookups else 0.0
+
+        rows = [
+            ("Uptime", "{} s".format(stats.get("uptime", 0))),
+            ("Requests", stats.get("requests", 0)),
+            ("Restarts", stats.get("restarts", 0)),
+            ("Schema cache", "{} of {} schemas".format(size, maxsize)),
+            ("Schema hits", "{} of {} ({:.0f}%)".format(hits, lookups, rate)),
+        ]
+        paths = stats.get("path_cache")
+        if paths:
+            rows.append(
+                (
+                    "Path cache",
+                    "{} of {} objects, {} hits, {} misses".format(
+                        paths["size"], paths["maxsize"], paths["hits"], paths["misses"]
+                    ),
                 )
-            rows = cur.fetchall()
-            res = ""
-            n = 0
-            self._desc_all_items.setText(str(n))
-            for sig, desc, ref in rows:
-                desc = desc + "&newline&Reference &newline&" + ref
-                sig, desc = formatReference(sig, desc, bold=[search])
-                sig = "<p style = 'background-color: lightgray'>{}</p>".format(
-                    sig
+            )
+        navigation = self._tree._proxy.navigationStats()
+        rows.append(
+            (
+                "Navigation",
+                "{} requests, {} coalesced, {} stale answers dropped".format(
+                    navigation["requests"],
+                    navigation["coalesced"],
+                    navigation["dropped"],
+                ),
+            )
+        )
+        rows.append(
+            (
+                "Auto refresh",
+                "{} refreshes for {} shell state changes".format(
+                    navigation["refreshes"], navigation["changes"]
+                ),
+            )
+        )
+        watch = stats.get("watch")
+        if watch:
+            rows.append(
+                (
+                    "Watch",
+                    "{} listened, {} polled, {} events, {} polls".format(
+                        watch["listened"],
+                        watch["polled"],
+                        watch["events"],
+                        watch["polls"],
+                    ),
                 )
-                res = res + sig + desc
-                n += 1
+            )
+        snapshots = self._tree._proxy._snapshots.stats()
+        rows.append(
+            (
+                "Snapshots",
+                "{} names, {} of {} KB, {} hits, {} misses".format(
+                    snapshots["size"],
+                    snapshots["bytes"] // 1024,
+                    snapshots["budget"] // 1024,
+                    snapshots["hits"],
+                    snapshots["misses"],
+                ),
+            )
+        )
+        help_cache = self._tree._help_cache.stats()
+        lookups = help_cache["hits"] + help_cache["misses"]
+        rate = 100.0 * help_cache["hits"] / lookups if lookups else 0.0
+        rows.append(
+            (
+                "Help cache",
+                "{} of {} names, {} hits of {} ({:.0f}%)".format(
+                    help_cache["size"],
+                    help_cache["maxsize"],
+                    help_cache["hits"],
+                    lookups,
+                    rate,
+                ),
+            )
+        )
+
+        txt = "<p style = 'background-color: lightgray'>{}</p>".format(
+            "Inspection service"
+        )
+        for name, value in rows:
+            txt = txt + "<p><strong>{}</strong>: {}</p>".format(name, value)
 
-            self._description.setText(res)
-            self._desc_all_items.setText(str(n))
+        self._description.setText(txt)
+        self._btn_toggle.setChecked(True)
 
     def onClearHelpPress(self):
         """ Remove results """
@@ -538,6 +710,16 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         self._tree.setVisible(not empty)
         self._initText.setVisible(empty)
 
+    def showEvent(self, event):
+        """ Refresh if the shell ran code while hidden """
+        self._tree._proxy.setShown(True)
+        QtWidgets.QWidget.showEvent(self, event)
+
+    def hideEvent(self, event):
+        """ Hidden tools do not refresh """
+        self._tree._proxy.setShown(False)
+        QtWidgets.QWidget.hideEvent(self, event)
+
     def onOptionsPress(self):
         """ Create the menu for the button, Do each time to make sure
         the checks are right. """
@@ -547,6 +729,10 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
         self._font_size_menu.clear()
         self._font_size_tree_menu.clear()
         self._font_size_help_menu.clear()
+        self._property_timeout_menu.clear()
+        self._engine_menu.clear()
+        self._snapshot_menu.clear()
+        self._refresh_menu.clear()
         self._history_menu.clear()
 
         # Get menu
@@ -565,6 +751,16 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
             selected=self._config.clearScreenAfter,
         )
 
+        menu.addItem(
+            pyzo.translate(
+                "pyzoWorkspace",
+                "Statistics ::: Show inspection service uptime and cache statistics.",
+            ),
+            icon=None,
+            callback=self.onStatisticsPress,
+            value=None,
+        )
+
         menu.addSeparator()
 
         # Font size menu
@@ -588,6 +784,57 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
 
         menu.addMenu(self._font_size_menu)
 
+        # Property timeout menu
+        currentTimeout = self._config.propertyTimeout
+        for i in [100, 250, 500, 1000, 2000, 0]:
+            if i:
+                action = self._property_timeout_menu.addAction("timeout: %ims" % i)
+            else:
+                action = self._property_timeout_menu.addAction("timeout: off")
+            action._timeout = i
+            action.setCheckable(True)
+            action.setChecked(i == currentTimeout)
+
+        menu.addMenu(self._property_timeout_menu)
+
+        # Engine menu
+        engines = [
+            ("auto", pyzo.translate("pyzoWorkspace", "Auto")),
+            ("introspection", pyzo.translate("pyzoWorkspace", "Introspection")),
+            ("reflection", pyzo.translate("pyzoWorkspace", "Reflection")),
+        ]
+
+        for engine, display in engines:
+            action = self._engine_menu.addAction(display)
+            action._engine = engine
+            action.setCheckable(True)
+            action.setChecked(engine == self._config.inspectionEngine)
+
+        menu.addMenu(self._engine_menu)
+
+        # Snapshot cache menu
+        currentBudget = self._config.snapshotBudget
+        for i in [1024, 4096, 16384, 0]:
+            if i:
+                action = self._snapshot_menu.addAction("budget: %iMB" % (i // 1024))
+            else:
+                action = self._snapshot_menu.addAction("budget: off")
+            action._budget = i
+            action.setCheckable(True)
+            action.setChecked(i == currentBudget)
+
+        menu.addMenu(self._snapshot_menu)
+
+        # Refresh rate menu
+        currentInterval = self._config.refreshInterval
+        for i in [250, 1000, 2000, 5000]:
+            action = self._refresh_menu.addAction("at most every %ims" % i)
+            action._interval = i
+            action.setCheckable(True)
+            action.setChecked(i == currentInterval)
+
+        menu.addMenu(self._refresh_menu)
+
         # History menu
         history_option = [
             (
@@ -678,13 +925,38 @@ class PyzoPyUNOWorkspace(QtWidgets.QWidget):
             self._config.hideTypes.append(type)
 
         # Update
-        self._tree.fillWorkspace()
+        self._tree.fillWorkspace(update=False)
 
     def onClearShell(self, value):
 
         self._config.clearScreenAfter = value
 
 
+    def onPropertyTimeoutMenuTiggered(self, action):
+        """  The user decides how long a property may take to read, slower
+        properties are deferred until clicked. """
+        self._config.propertyTimeout = action._timeout
+
+    def onEngineMenuTiggered(self, action):
+        """  The user decides how UNO members are listed, with
+        theIntrospection or with the property set info and
+        theCoreReflection. """
+        self._config.inspectionEngine = action._engine
+
+        # Update
+        self._tree._proxy.requestData()
+
+    def onSnapshotMenuTiggered(self, action):
+        """  The user decides how much memory the snapshots of recent
+        names may use, they are shown at once when going back. """
+        self._config.snapshotBudget = action._budget
+        self._tree._proxy._snapshots.setBudget(action._budget * 1024)
+
+    def onRefreshMenuTiggered(self, action):
+        """  The user decides how often the workspace may refresh while
+        code runs in the shell. """
+        self._config.refreshInterval = action._interval
+
     def onFontHelpOptionMenuTiggered(self, action):
         """  The user decides about font size in the Help. """
         # Get text
@@ -1,22 +1,22 @@
+from collections import OrderedDict
 import configparser
 from inspect import getsourcefile
-from json import load
 import os
-import re
-import sqlite3
+import sys
+import time
 import webbrowser
 
 import pyzo
 from pyzo import translate
 from pyzo.util.qt import QtCore, QtGui, QtWidgets
-from .utils import splitName, splitNameCleaner, joinName
+from .utils import LRUCache, splitName, splitNameCleaner, splitPath, joinName
+from .unodoc import HelpCache, NameIndex, describe, ensureNameIndex, getConnection
 
 
 # Constants
 WORKSPACE_INIT = os.path.abspath(getsourcefile(lambda: 0))
 WORKSPACE_DIR = os.path.dirname(WORKSPACE_INIT)
 CONF_FILE = os.path.join(WORKSPACE_DIR, "config.ini")
-UNODOC_DB = os.path.join(WORKSPACE_DIR, "unoDoc.db")
 
 # Read configuration
 config = configparser.ConfigParser()
@@ -38,35 +38,15 @@ SNIPPET_SUFIX = config.get("GENERAL", "snippet_sufix")
 # print("SNIPPET_PATH = " + SNIPPET_PATH)
 # print("SNIPPET_SUFIX = " + SNIPPET_SUFIX)
 
-# connect documentation database
-conn = sqlite3.connect(UNODOC_DB)
+# Repr of a value which is not read yet
+PENDING = "..."
 
-# JSON serialization path
-RESULTFILE_JSON = "result.txt"
-RESULT_JSON = os.path.join(WORKSPACE_DIR, RESULTFILE_JSON)
-# Pickle path
-RESULTFILE_PICKLE = "result.pkl"
-RESULT_PICKLE = os.path.join(WORKSPACE_DIR, RESULTFILE_PICKLE)
 # History file
 HISTORYFILE = "ws_history.txt"
 HISTORY = os.path.join(WORKSPACE_DIR, HISTORYFILE)
 DIALOG_INPUT = []
 
 
-# Result file
-def createResultFile():
-
-    if os.path.exists(RESULT_JSON):
-        os.remove(RESULT_JSON)
-
-    with open(RESULT_JSON, "w") as f:
-        f.write('{}')
-
-
-def getResultFilePath():
-    return  RESULT_JSON
-
-
 # History file
 def createHistoryFile():
 
@@ -97,60 +77,574 @@ def readHistory():
     return l
 
 
-def formatReference(signature, description, bold=[]):
+class PyUNODocSignals(QtCore.QObject):
+    """ Signals of PyUNODocTask, they live in the GUI thread. """
 
-    # format signature
-    signature = signature.replace("&newline&", "\n")
-    # bold
-    if bold:
-        for m in bold:
-            signature = re.sub(
-                r"\b" + m + r"\b", "<strong>{}</strong>".format(m), signature
-            )
-    # bold red
-    for r in ["set raises", "get raises", "raises"]:
-        signature = signature.replace(
-            r, '<span style="font-weight:bold;color:red">{}</span>'.format(r)
-        )
+    done = QtCore.Signal(int, object)
 
-    # format description
-    description = description.replace("&newline&&newline&", "<p></p>")
-    description = description.replace("&newline&", "<p></p>")
-    # bold
-    for d in ["Parameters", "Exceptions", "Returns", "Enumerator"]:
-        description = re.sub(
-            r"\b{}\b".format(d),
-            "<p style='font-weight:bold'>{}</p>".format(d),
-            description,
-        )
-    # bold blue
-    for d in ["See also", "See Also", "Reference"]:
-        description = re.sub(
-            r"\b{}\b".format(d),
-            "<p style='font-weight:bold;color:blue'>{}</p>".format(d),
-            description,
-        )
 
-    # bold red
-    for w in ["Deprecated", "Attention"]:
-        description = re.sub(
-            r"\b{}\b".format(w),
-            '<span style="font-weight:bold;color:red">{}</span>'.format(w),
-            description,
-        )
+class PyUNODocTask(QtCore.QRunnable):
+    """ PyUNODocTask
 
-    return signature, description
+    Run a documentation function in a worker thread with the read-only
+    connection of that thread, and emit the result. The first task builds
+    the name index, if the database is writable.
 
+    """
+
+    def __init__(self, loader, request_id, function, args):
+        QtCore.QRunnable.__init__(self)
+        self._loader = loader
+        self._request_id = request_id
+        self._function = function
+        self._args = args
+
+    def cancelled(self):
+        return self._request_id != self._loader._request_id
 
-class PyUNOWorkspaceItem(QtWidgets.QTreeWidgetItem):
-    def __lt__(self, otherItem):
-        column = self.treeWidget().sortColumn()
+    def run(self):
+        if self.cancelled():
+            return
         try:
-            return float(self.text(column).strip("[]")) > float(
-                otherItem.text(column).strip("[]")
+            ensureNameIndex()
+            result = self._function(
+                getConnection(), *self._args, cancelled=self.cancelled
             )
-        except ValueError:
-            return self.text(column) > otherItem.text(column)
+        except Exception as err:
+            print("UNO documentation: ", err)
+            result = None
+        if not self.cancelled():
+            self._loader._signals.done.emit(self._request_id, result)
+
+
+class PyUNODocLoader(QtCore.QObject):
+    """ PyUNODocLoader
+
+    Documentation lookups and HTML rendering off the GUI thread.
+    A new request cancels the previous one: it is removed from the queue
+    if not started, stops at its next check if running, and its result
+    is dropped if already sent.
+
+    """
+
+    def __init__(self, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self._request_id = 0
+        self._callback = None
+
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        # keep the thread, and so its connection
+        self._pool.setExpiryTimeout(-1)
+
+        self._signals = PyUNODocSignals()
+        self._signals.done.connect(self.onDone)
+
+    def request(self, function, *args, callback=None):
+        """ request(function, *args, callback=None)
+        Call function(connection, *args, cancelled=...) in the worker and
+        callback(result) in the GUI thread.
+        """
+        self.cancel()
+        self._callback = callback
+        self._pool.start(PyUNODocTask(self, self._request_id, function, args))
+
+    def cancel(self):
+        """ cancel()
+        Cancel the current request.
+        """
+        self._request_id += 1
+        self._pool.clear()
+
+    def onDone(self, request_id, result):
+        if request_id == self._request_id and self._callback is not None:
+            self._callback(result)
+
+
+class PyUNOContainerCombo(QtWidgets.QComboBox):
+    """ PyUNOContainerCombo
+
+    A paged combo box for container elements (getByName, getByIndex,
+    createEnumeration). Only one window of elements is requested from the
+    shell, the first time the popup is opened. The previous/next entries
+    request the neighbouring windows.
+
+    """
+
+    requestItems = QtCore.Signal(str, int)
+    elementActivated = QtCore.Signal(str)
+
+    def __init__(self, parent, method, placeholder, extra=[]):
+        QtWidgets.QComboBox.__init__(self, parent)
+        self._method = method
+        self._placeholder = placeholder
+        self._extra = extra
+        self._loaded = False
+        # item index -> start of the window it opens
+        self._pages = {}
+
+        self.activated[int].connect(self.onActivated)
+
+    def reset(self):
+        """ reset()
+        Remove all items and disable.
+        """
+        self.clear()
+        self._loaded = False
+        self._pages = {}
+        self.setEnabled(False)
+
+    def setAvailable(self, available):
+        """ setAvailable(available)
+        Show placeholder, elements are loaded when the popup is opened.
+        """
+        self.reset()
+        self.addItem(self._placeholder)
+        self.setEnabled(bool(available))
+
+    def setItems(self, page):
+        """ setItems(page)
+        Fill a window of elements and open the popup.
+        page is a dict with 'start', 'count', 'more' and 'items'.
+        """
+        start = page["start"]
+        items = page["items"]
+        count = page["count"]
+        # windows are aligned on the page size, the last one may be short
+        size = max(int(pyzo.config.tools.pyzopyunoworkspace.containerPageSize), 1)
+
+        self.clear()
+        self._pages = {}
+        self._loaded = True
+
+        self.addItem(self._placeholder)
+        self.addItems(self._extra)
+        if start > 0:
+            previous = max(0, start - size)
+            self._pages[self.count()] = previous
+            self.addItem("<< {} - {}".format(previous, start - 1))
+        self.addItems(items)
+        if page["more"]:
+            stop = start + len(items)
+            self._pages[self.count()] = stop
+            if count:
+                last = min(stop + size, count) - 1
+                self.addItem("{} - {} of {} >>".format(stop, last, count))
+            else:
+                self.addItem("{} - ... >>".format(stop))
+
+        if self.isVisible():
+            QtWidgets.QComboBox.showPopup(self)
+
+    def showPopup(self):
+        if self._loaded:
+            QtWidgets.QComboBox.showPopup(self)
+        else:
+            self.requestItems.emit(self._method, 0)
+
+    def onActivated(self, index):
+        """ onActivated(index)
+        Request another window or notify the selected element.
+        """
+        if index in self._pages:
+            self.requestItems.emit(self._method, self._pages[index])
+        elif index > 0:
+            self.elementActivated.emit(self.itemText(index))
+
+
+class PyUNONameCompleter(QtWidgets.QCompleter):
+    """ PyUNONameCompleter
+
+    Search-as-you-type completer for a line edit. Completions come from
+    a NameIndex returned by getIndex, they are updated after a short
+    pause in typing.
+
+    """
+
+    DELAY = 60
+
+    def __init__(self, lineEdit, getIndex):
+        QtWidgets.QCompleter.__init__(self, lineEdit)
+        self._lineEdit = lineEdit
+        self._getIndex = getIndex
+
+        self._model = QtCore.QStringListModel(self)
+        self.setModel(self._model)
+        self.setWidget(lineEdit)
+        # names are ranked by the index, show them as they are
+        self.setCompletionMode(QtWidgets.QCompleter.UnfilteredPopupCompletion)
+        self.setMaxVisibleItems(12)
+
+        # debounce
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DELAY)
+        self._timer.timeout.connect(self.updateCompletions)
+
+        lineEdit.textEdited.connect(lambda text: self._timer.start())
+        self.activated[str].connect(lineEdit.setText)
+
+    def updateCompletions(self):
+        """ updateCompletions()
+        Show the completions of the current text.
+        """
+        text = self._lineEdit.text()
+        index = self._getIndex()
+        names = index.complete(text) if text and index is not None else []
+        self._model.setStringList(names)
+        if names and not (len(names) == 1 and names[0] == text):
+            self.complete()
+        else:
+            self.popup().hide()
+
+
+def sortKey(text):
+    """ sortKey(text)
+    Precomputed sort key, numbers and indexes eg. '[12]' sort by value.
+    """
+    try:
+        return (0, float(text.strip("[]")), text)
+    except ValueError:
+        return (1, 0.0, text)
+
+
+def formatSummary(summary):
+    """ formatSummary(summary)
+    Tooltip text of a numeric sequence summary from the inspector.
+    """
+
+    def number(value):
+        return "-" if value is None else "{:g}".format(value)
+
+    lines = [
+        "shape: {}".format(" x ".join(str(n) for n in summary.get("shape", []))),
+        "dtype: {}".format(summary.get("dtype", "")),
+        "min: {}  max: {}  mean: {}".format(
+            number(summary.get("min")),
+            number(summary.get("max")),
+            number(summary.get("mean")),
+        ),
+        "NaN: {}  empty: {}  text: {}".format(
+            summary.get("nan", 0), summary.get("empty", 0), summary.get("text", 0)
+        ),
+        "preview:",
+    ]
+    for row in summary.get("preview", []):
+        if not isinstance(row, list):
+            row = [row]
+        lines.append("  " + "  ".join(repr(cell) for cell in row))
+    return "\n".join(lines)
+
+
+class PyUNOWorkspaceModel(QtCore.QAbstractTableModel):
+    """ PyUNOWorkspaceModel
+
+    Rows of the workspace tree (name, type, repr) kept in a list of tuples
+    with precomputed sort keys. The view gets the rows in batches through
+    canFetchMore/fetchMore, so only rows near the visible area are added.
+    The rows are kept sorted, a batch always continues the sorted order.
+
+    """
+
+    BATCH = 200
+    HEADERS = ["Name", "Type", "Repr"]
+
+    CHANGED = QtGui.QColor(255, 240, 160)
+
+    def __init__(self, parent=None):
+        QtCore.QAbstractTableModel.__init__(self, parent)
+        self._rows = []
+        self._keys = []
+        self._loaded = 0
+        self._sort = (0, QtCore.Qt.AscendingOrder)
+        # names of the rows changed by the last update
+        self._changed = set()
+        # prefix index of the names, built on demand
+        self._name_index = None
+        # tooltips by name
+        self._tooltips = {}
+
+    def setRows(self, rows):
+        """ setRows(rows)
+        Replace all rows, rows is a list of (name, type, repr).
+        """
+        self.beginResetModel()
+        self._rows = [tuple(row) for row in rows]
+        self._keys = [tuple(sortKey(text) for text in row) for row in self._rows]
+        self._sortRows()
+        self._loaded = min(self.BATCH, len(self._rows))
+        self._changed = set()
+        self._name_index = None
+        self.endResetModel()
+
+    def setToolTips(self, tooltips):
+        """ setToolTips(tooltips)
+        Set the tooltips of the rows, a dict {name: text}.
+        """
+        self._tooltips = tooltips
+
+    def updateRows(self, rows, highlight=True):
+        """ updateRows(rows, highlight=True)
+        Update to new rows of the same object. Unchanged rows are kept,
+        changed cells are patched and highlighted, so scroll position and
+        selection are not lost.
+        """
+        new = {}
+        for row in rows:
+            new[row[0]] = tuple(row)
+        self._name_index = None
+
+        # clear previous highlight
+        highlighted = self._changed
+        self._changed = set()
+
+        # remove rows that are gone
+        for i in reversed(range(len(self._rows))):
+            if self._rows[i][0] in new:
+                continue
+            if i < self._loaded:
+                self.beginRemoveRows(QtCore.QModelIndex(), i, i)
+                del self._rows[i]
+                del self._keys[i]
+                self._loaded -= 1
+                self.endRemoveRows()
+            else:
+                del self._rows[i]
+                del self._keys[i]
+
+        # patch changed rows
+        for i, row in enumerate(self._rows):
+            if new[row[0]] != row:
+                self._rows[i] = new[row[0]]
+                self._keys[i] = tuple(sortKey(text) for text in new[row[0]])
+                if highlight:
+                    self._changed.add(row[0])
+
+        # add new rows at the end
+        names = set(row[0] for row in self._rows)
+        added = [row for name, row in new.items() if name not in names]
+        if added:
+            all_loaded = self._loaded == len(self._rows)
+            first = len(self._rows)
+            if all_loaded:
+                last = first + len(added) - 1
+                self.beginInsertRows(QtCore.QModelIndex(), first, last)
+            self._rows.extend(added)
+            self._keys.extend(tuple(sortKey(text) for text in row) for row in added)
+            if highlight:
+                self._changed.update(row[0] for row in added)
+            if all_loaded:
+                self._loaded = len(self._rows)
+                self.endInsertRows()
+
+        # restore order, then repaint changed and previously changed rows
+        self.sort(*self._sort)
+        last = self.columnCount() - 1
+        for i in range(self._loaded):
+            name = self._rows[i][0]
+            if name in self._changed or name in highlighted:
+                self.dataChanged.emit(self.index(i, 0), self.index(i, last))
+
+    def row(self, row):
+        """ row(row)
+        Return (name, type, repr) of a row.
+        """
+        return self._rows[row]
+
+    def totalCount(self):
+        """ totalCount()
+        Number of rows, also the ones not yet fetched by the view.
+        """
+        return len(self._rows)
+
+    def nameIndex(self):
+        """ nameIndex()
+        Prefix index of the names of all rows.
+        """
+        if self._name_index is None:
+            self._name_index = NameIndex(row[0] for row in self._rows)
+        return self._name_index
+
+    def fetchAll(self):
+        """ fetchAll()
+        Make all rows available to the view, eg. for filtering.
+        """
+        while self.canFetchMore():
+            self.fetchMore()
+
+    def _sortRows(self):
+        column, order = self._sort
+        reverse = order == QtCore.Qt.DescendingOrder
+        keys = [key[column] for key in self._keys]
+        index = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+        self._rows = [self._rows[i] for i in index]
+        self._keys = [self._keys[i] for i in index]
+
+    # Model interface
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        elif role == QtCore.Qt.BackgroundRole:
+            if self._rows[index.row()][0] in self._changed:
+                return self.CHANGED
+        elif role == QtCore.Qt.ToolTipRole:
+            return self._tooltips.get(self._rows[index.row()][0])
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return
+        n = min(self.BATCH, len(self._rows) - self._loaded)
+        if n <= 0:
+            return
+        first = self._loaded
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + n - 1)
+        self._loaded += n
+        self.endInsertRows()
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        # keep selection and current row on the same names
+        old = self.persistentIndexList()
+        names = [self._rows[index.row()][0] for index in old]
+
+        self._sort = (column, order)
+        self._sortRows()
+
+        position = {row[0]: i for i, row in enumerate(self._rows)}
+        new = []
+        for name, index in zip(names, old):
+            i = position.get(name, self._loaded)
+            if i < self._loaded:
+                new.append(self.index(i, index.column()))
+            else:
+                new.append(QtCore.QModelIndex())
+        self.changePersistentIndexList(old, new)
+        self.layoutChanged.emit()
+
+
+class PyUNOWorkspaceFilterModel(QtCore.QSortFilterProxyModel):
+    """ PyUNOWorkspaceFilterModel
+
+    Proxy between the workspace model and the view. Sorting is done by
+    the source model on its precomputed keys, so rows which are not yet
+    fetched arrive in order. Filtering matches the filter text against
+    the lowercase names.
+
+    """
+
+    def __init__(self, parent=None):
+        QtCore.QSortFilterProxyModel.__init__(self, parent)
+        self._filter = ""
+
+    def setFilterText(self, text):
+        """ setFilterText(text)
+        Show only rows whose name contains text, case insensitive.
+        """
+        self._filter = text.lower()
+        if self._filter:
+            self.sourceModel().fetchAll()
+        self.invalidateFilter()
+
+    def filterText(self):
+        """ filterText()
+        Current filter text.
+        """
+        return self._filter
+
+    def filterAcceptsRow(self, row, parent):
+        if not self._filter:
+            return True
+        return self._filter in self.sourceModel().row(row)[0].lower()
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def sourceRow(self, index):
+        """ sourceRow(index)
+        Return (name, type, repr) for an index of the view or None.
+        """
+        if not index.isValid():
+            return None
+        return self.sourceModel().row(self.mapToSource(index).row())
+
+
+class PyUNOSnapshotCache(LRUCache):
+    """ PyUNOSnapshotCache
+
+    LRU cache of inspection snapshots (variables, UNO dict and response),
+    keyed by the shell and the name. The least recently used snapshots
+    are dropped when their estimated size exceeds the budget in bytes.
+
+    """
+
+    def __init__(self, budget):
+        LRUCache.__init__(self, budget, weigh=self.snapshotSize)
+
+    @staticmethod
+    def snapshotSize(snapshot):
+        """ snapshotSize(snapshot)
+        Estimate the memory used by a whole snapshot: the rows, the member
+        info and the response with its containers, declaring interfaces
+        and summaries. Objects shared by its parts are counted once.
+        """
+        size = 0
+        seen = set()
+        stack = [snapshot]
+        while stack:
+            value = stack.pop()
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            size += sys.getsizeof(value)
+            if isinstance(value, dict):
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                stack.extend(value)
+        return size
+
+    def setBudget(self, budget):
+        """ setBudget(budget)
+        Change the budget in bytes and drop what does not fit.
+        """
+        self.setMaxsize(budget)
+
+    def stats(self):
+        """ stats()
+        Return the number of snapshots, their bytes, the budget, hits and
+        misses.
+        """
+        return {
+            "size": len(self),
+            "bytes": self.weight,
+            "budget": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
 
 
 class PyUNOWorkspaceProxy(QtCore.QObject):
@@ -160,9 +654,30 @@ class PyUNOWorkspaceProxy(QtCore.QObject):
     from the shell. The workspace tool asks for a certain name, and this
     class notifies when new data is available using a qt signal.
 
+    Requests within a short window are coalesced, only the last name of
+    a burst is sent to the shell. Answers for a superseded request are
+    dropped.
+
+    Answers are kept as snapshots, going back, forward or to the history
+    shows the snapshot at once while the shell is asked again.
+
+    After code ran in the shell, the data is refreshed once the shell is
+    idle for a moment, at most once per refresh interval, and only while
+    the tool is shown.
+
+    In watch mode the kernel watches the properties of the current name
+    and the changed rows are patched in, until navigation moves on.
+
     """
 
+    DELAY = 80
+    IDLE = 250
+    POLL_INTERVAL = 50
+    WATCH_INTERVAL = 500
+
     haveNewData = QtCore.Signal()
+    haveContainerItems = QtCore.Signal(str, dict)
+    haveStatistics = QtCore.Signal(dict)
 
     def __init__(self):
         QtCore.QObject.__init__(self)
@@ -171,6 +686,62 @@ class PyUNOWorkspaceProxy(QtCore.QObject):
         self._variables = []
         self._uno_dict = {}
 
+        # Current request id
+        self._request_id = 0
+        # Members received so far from a background inspection
+        self._response = None
+        # True while more chunks of the current request follow
+        self._streaming = False
+        # poll the chunks of the background inspection, the kernel does
+        # not wait for them
+        self._poll_job = None
+        self._poll_timer = QtCore.QTimer(self)
+        self._poll_timer.setSingleShot(True)
+        self._poll_timer.setInterval(self.POLL_INTERVAL)
+        self._poll_timer.timeout.connect(self.pollChunks)
+        # Requests sent, coalesced and answers dropped
+        self._counts = {
+            "requests": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "changes": 0,
+            "refreshes": 0,
+        }
+
+        # Shell ran code since the last request
+        self._dirty = False
+        # Hidden tools do not refresh
+        self._shown = True
+        self._last_refresh = 0.0
+
+        # refresh after the shell is idle
+        self._refresh_timer = QtCore.QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+        # Watch mode, watched name, kernel watch id and its shell
+        self._watching = False
+        self._watch_name = None
+        self._watch_id = None
+        self._watch_shell = None
+
+        # changes of the watch
+        self._watch_timer = QtCore.QTimer(self)
+        self._watch_timer.setInterval(self.WATCH_INTERVAL)
+        self._watch_timer.timeout.connect(self.requestChanges)
+
+        # Snapshots of recent names, budget in KB
+        budget = pyzo.config.tools.pyzopyunoworkspace.snapshotBudget
+        self._snapshots = PyUNOSnapshotCache(budget * 1024)
+        # Names left by going back
+        self._forward = []
+
+        # coalesce
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DELAY)
+        self._timer.timeout.connect(self.requestData)
+
         # Element to get more info of
         self._name = ""
 
@@ -199,25 +770,417 @@ class PyUNOWorkspaceProxy(QtCore.QObject):
 
     def setName(self, name):
         """ setName(name)
-        Set the name that we want to know more of.
+        Set the name that we want to know more of. The request is sent
+        after a short pause, a following setName replaces it.
         """
+        if name != self._name:
+            self._forward = []
+        self.navigate(name)
 
+    def navigate(self, name):
+        """ navigate(name)
+        Show the snapshot of name if there is one, and request its data.
+        """
+        if self._watch_name is not None and self._watch_name != name:
+            self.unwatch()
         self._name = name
         shell = pyzo.shells.getCurrentShell()
         if shell:
-            # via unoinspect
-            if not self._name or self._name.endswith(".value"):
-                createResultFile()
-            else:
-                shell.executeCommand(
-                     "Inspector().inspect(" + str(self._name) + ")\n")
-            # via pyzo
-            future = shell._request.dir2(self._name)
-            future.add_done_callback(self.processResponse)
+            self.restoreSnapshot(shell)
+            self.scheduleRequest()
 
             if pyzo.config.tools.pyzopyunoworkspace.clearScreenAfter:
                 shell.clearScreen()
 
+    def restoreSnapshot(self, shell):
+        """ restoreSnapshot(shell)
+        Show the snapshot of the current name, if there is one.
+        """
+        snapshot = self._snapshots.get((id(shell), self._name))
+        if snapshot is None:
+            return
+        self._variables, self._uno_dict, self._response = self.copySnapshot(
+            *snapshot
+        )
+        self._streaming = False
+        self.haveNewData.emit()
+
+    def storeSnapshot(self):
+        """ storeSnapshot()
+        Keep a copy of the complete answer for the current name, so later
+        patches do not change it behind the cache.
+        """
+        shell = pyzo.shells.getCurrentShell()
+        if shell:
+            self._snapshots.put(
+                (id(shell), self._name),
+                self.copySnapshot(self._variables, self._uno_dict, self._response),
+            )
+
+    @staticmethod
+    def copySnapshot(variables, uno_dict, response):
+        """ copySnapshot(variables, uno_dict, response)
+        Copy the parts of a snapshot which patchRows changes.
+        """
+        variables = [list(row) for row in variables]
+        uno_dict = {name: dict(info) for name, info in uno_dict.items()}
+        if response is not None:
+            response = dict(response, rows=OrderedDict(response["rows"]))
+        return variables, uno_dict, response
+
+    def scheduleRequest(self):
+        """ scheduleRequest()
+        Request the data of the current name after a short pause. Answers
+        of earlier requests are dropped from now on.
+        """
+        if self._timer.isActive():
+            self._counts["coalesced"] += 1
+        self._request_id += 1
+        self._timer.start()
+
+    def setShown(self, shown):
+        """ setShown(shown)
+        The tool is shown or hidden. A shown tool refreshes if the shell
+        ran code while it was hidden. The kernel stops watching while the
+        tool is hidden, a shown tool in watch mode refreshes and watches
+        again.
+        """
+        self._shown = shown
+        if not shown:
+            self.unwatch()
+        elif self._watching and self._name:
+            self._dirty = True
+        if shown and self._dirty:
+            self.scheduleRefresh()
+
+    def scheduleRefresh(self):
+        """ scheduleRefresh()
+        Refresh after the shell is idle for a moment, but not sooner than
+        the refresh interval after the last refresh. A following call
+        restarts the wait.
+        """
+        interval = pyzo.config.tools.pyzopyunoworkspace.refreshInterval / 1000.0
+        wait = self._last_refresh + interval - time.monotonic()
+        self._refresh_timer.start(int(max(self.IDLE, 1000 * wait)))
+
+    def refresh(self):
+        """ refresh()
+        Request the data again if the shell ran code since the last
+        request, and the tool is shown and the shell is not busy.
+        """
+        shell = pyzo.shells.getCurrentShell()
+        if not (shell and self._dirty and self._shown):
+            return
+        if shell._state.lower() == "busy":
+            # the next state change schedules a refresh
+            return
+        self._last_refresh = time.monotonic()
+        self._counts["refreshes"] += 1
+        self.requestData()
+
+    def setWatching(self, watching):
+        """ setWatching(watching)
+        Turn watch mode on or off.
+        """
+        self._watching = watching
+        if watching:
+            self.requestWatch()
+        else:
+            self.unwatch()
+
+    def requestWatch(self):
+        """ requestWatch()
+        Ask the shell to watch the properties of the current name, and
+        the document at the root of the name for modifications.
+        """
+        shell = pyzo.shells.getCurrentShell()
+        if not (shell and self._watching and self._shown and self._name):
+            return
+        if self._watch_name == self._name or self._name.endswith(".value"):
+            return
+        config = pyzo.config.tools.pyzopyunoworkspace
+        timeout = config.propertyTimeout / 1000.0
+        root = splitPath(self._name)[:1]
+        future = shell._request.eval(
+            self.serviceCommand("watch", root, config.inspectionEngine, timeout)
+        )
+        self._watch_name = self._name
+        self._watch_id = None
+        self._watch_shell = shell
+        future._name = self._name
+        future.add_done_callback(self.processWatchResponse)
+
+    def processWatchResponse(self, future):
+        """ processWatchResponse(response)
+        The shell watches the current name, poll its changes.
+        """
+        if future.cancelled():
+            return
+        elif future.exception():
+            print("Introspect-watch-exception: ", future.exception())
+            return
+
+        response = future.result()
+        # response for the previous object or error message
+        if future._name != self._watch_name or not isinstance(response, dict):
+            return
+        self._watch_id = response["watch"]
+        self._watch_timer.start()
+
+    def requestChanges(self):
+        """ requestChanges()
+        Ask the shell for the properties changed since the last poll.
+        """
+        shell = self._watch_shell
+        if not shell or self._watch_id is None:
+            self._watch_timer.stop()
+            return
+        if not self._shown:
+            return
+        future = shell._request.eval(
+            "Inspector.service().changes({!r})".format(self._watch_id)
+        )
+        future._watch_id = self._watch_id
+        future.add_done_callback(self.processChangesResponse)
+
+    def processChangesResponse(self, future):
+        """ processChangesResponse(response)
+        We got changed properties, patch our list.
+        """
+        if future.cancelled():
+            return
+        elif future.exception():
+            print("Introspect-changes-exception: ", future.exception())
+            return
+
+        response = future.result()
+        # response for the previous watch or error message
+        if future._watch_id != self._watch_id or not isinstance(response, dict):
+            return
+        if response["rows"]:
+            self.patchRows(response["rows"])
+        if not response["active"]:
+            # object disposed or watch stopped, watch again after the
+            # next finished inspection
+            self._watch_timer.stop()
+            self._watch_id = None
+            self._watch_name = None
+            self._watch_shell = None
+
+    def unwatch(self):
+        """ unwatch()
+        Ask the shell which watches to stop watching, it may no longer be
+        the current shell.
+        """
+        self._watch_timer.stop()
+        if self._watch_name is None:
+            return
+        shell = self._watch_shell
+        self._watch_name = None
+        self._watch_id = None
+        self._watch_shell = None
+        if shell:
+            try:
+                shell._request.eval("Inspector.service().unwatch()")
+            except Exception as err:
+                # the shell is closed, its kernel is gone
+                print("Introspect-unwatch-exception: ", err)
+
+    def navigationStats(self):
+        """ navigationStats()
+        Return the number of requests sent, coalesced and dropped.
+        """
+        return dict(self._counts)
+
+    def serviceCommand(self, method, *args):
+        """ serviceCommand(method, *args)
+        Command that calls the kernel inspection service for the current
+        name. The name is sent as a parsed path, so the service evaluates
+        only the parts that are not in its path cache.
+        """
+        path = "Inspector.service().evaluate({!r}, locals())".format(
+            splitPath(self._name)
+        )
+        args = "".join(", {!r}".format(arg) for arg in args)
+        return "Inspector.service().{}({}{})".format(method, path, args)
+
+    def invalidate(self):
+        """ invalidate()
+        Ask the kernel inspection service to forget evaluated paths.
+        """
+        shell = pyzo.shells.getCurrentShell()
+        if shell:
+            shell._request.eval("Inspector.service().invalidate()")
+
+    def requestData(self):
+        """ requestData()
+        Ask the shell for the members of the current name. The namespace
+        comes from pyzo (dir2), everything else from a background
+        inspection of the kernel inspection service, which merges Python
+        and UNO members and sends them in chunks: names and types first,
+        then the values. The answers are tagged with the request id.
+        """
+        self._timer.stop()
+        self._poll_timer.stop()
+        shell = pyzo.shells.getCurrentShell()
+        if not shell:
+            return
+
+        self._request_id += 1
+        self._counts["requests"] += 1
+
+        if self._dirty:
+            # code ran in the shell, evaluated objects may be stale
+            self._dirty = False
+            self.invalidate()
+
+        if not self._name:
+            # via pyzo
+            if self._streaming:
+                # stop the background inspection
+                shell._request.eval("Inspector.service().cancel()")
+                self._streaming = False
+            future = shell._request.dir2(self._name)
+        else:
+            # via unoinspect
+            uno = not self._name.endswith(".value")
+            config = pyzo.config.tools.pyzopyunoworkspace
+            # time budget to read one property, in seconds
+            timeout = config.propertyTimeout / 1000.0
+            future = shell._request.eval(
+                self.serviceCommand("start", uno, timeout, config.inspectionEngine)
+            )
+        future._request_id = self._request_id
+        future.add_done_callback(self.processResponse)
+
+    def requestChunks(self, job_id):
+        """ requestChunks(job_id)
+        Ask the shell for the next chunks of a background inspection,
+        after the poll interval.
+        """
+        self._poll_job = job_id
+        self._poll_timer.start()
+
+    def pollChunks(self):
+        """ pollChunks()
+        Poll the chunks of the background inspection. The shell answers
+        at once with the chunks ready so far.
+        """
+        shell = pyzo.shells.getCurrentShell()
+        if not shell or self._poll_job is None:
+            self._streaming = False
+            return
+        future = shell._request.eval(
+            "Inspector.service().poll({!r})".format(self._poll_job)
+        )
+        future._request_id = self._request_id
+        future.add_done_callback(self.processResponse)
+
+    def requestContainerItems(self, method, start=0):
+        """ requestContainerItems(method, start=0)
+        Ask the shell for a window of elements of the current container.
+        """
+        shell = pyzo.shells.getCurrentShell()
+        if shell and self._name:
+            size = pyzo.config.tools.pyzopyunoworkspace.containerPageSize
+            future = shell._request.eval(
+                self.serviceCommand("inspectContainer", method, int(start), int(size))
+            )
+            future._name = self._name
+            future._method = method
+            future.add_done_callback(self.processContainerResponse)
+
+    def processContainerResponse(self, future):
+        """ processContainerResponse(response)
+        We got container elements, notify the tree.
+        """
+        if future.cancelled():
+            return
+        elif future.exception():
+            print("Introspect-container-exception: ", future.exception())
+            return
+
+        page = future.result()
+        # response for the previous object or error message
+        if future._name != self._name or not isinstance(page, dict):
+            return
+        self.haveContainerItems.emit(future._method, page)
+
+    def requestProperty(self, name):
+        """ requestProperty(name)
+        Ask the shell for the value of a deferred property.
+        """
+        shell = pyzo.shells.getCurrentShell()
+        if shell and self._name:
+            engine = pyzo.config.tools.pyzopyunoworkspace.inspectionEngine
+            future = shell._request.eval(
+                self.serviceCommand("readProperty", name, engine)
+            )
+            future._name = self._name
+            future.add_done_callback(self.processPropertyResponse)
+
+    def processPropertyResponse(self, future):
+        """ processPropertyResponse(response)
+        We got the row of a deferred property, update our list and
+        notify the tree.
+        """
+        if future.cancelled():
+            return
+        elif future.exception():
+            print("Introspect-property-exception: ", future.exception())
+            return
+
+        row = future.result()
+        # response for the previous object or error message
+        if future._name != self._name or not isinstance(row, (list, tuple)):
+            return
+
+        self.patchRows([row])
+
+    def patchRows(self, rows):
+        """ patchRows(rows)
+        Replace the rows of the same names in our list, and notify the
+        tree.
+        """
+        index = {old[0]: i for i, old in enumerate(self._variables)}
+        for row in rows:
+            row = list(row)
+            name = row[0]
+            if name in index:
+                self._variables[index[name]] = row
+            if name in self._uno_dict:
+                self._uno_dict[name]["repr"] = row[3]
+                self._uno_dict[name].pop("deferred", None)
+            if self._response is not None and name in self._response["rows"]:
+                self._response["rows"][name] = row
+        self.haveNewData.emit()
+        if not self._streaming:
+            # the snapshot and its size follow the patch
+            self.storeSnapshot()
+
+    def requestStatistics(self):
+        """ requestStatistics()
+        Ask the shell for the inspection service statistics.
+        """
+        shell = pyzo.shells.getCurrentShell()
+        if shell:
+            future = shell._request.eval("Inspector.service().stats()")
+            future.add_done_callback(self.processStatisticsResponse)
+
+    def processStatisticsResponse(self, future):
+        """ processStatisticsResponse(response)
+        We got the inspection service statistics.
+        """
+        if future.cancelled():
+            return
+        elif future.exception():
+            print("Introspect-statistics-exception: ", future.exception())
+            return
+
+        stats = future.result()
+        if isinstance(stats, dict):
+            self.haveStatistics.emit(stats)
+
     def goUp(self):
         """ goUp()
         Cut the last part off the name.
@@ -227,13 +1190,23 @@ class PyUNOWorkspaceProxy(QtCore.QObject):
             if parts:
                 parts.pop()
 
-            self.setName(joinName(parts))
+            self._forward.append(self._name)
+            self.navigate(joinName(parts))
+
+    def goForward(self):
+        """ goForward()
+        Return to the name left by going back.
+        """
+        if self._forward:
+            self.navigate(self._forward.pop())
 
     def onCurrentShellChanged(self):
         """ onCurrentShellChanged()
-        When no shell is selected now, update this. In all other cases,
-        the onCurrentShellStateChange will be fired too.
+        Stop the watch of the previous shell. When no shell is selected
+        now, update this. In all other cases, the onCurrentShellStateChange
+        will be fired too.
         """
+        self.unwatch()
         shell = pyzo.shells.getCurrentShell()
         if not shell:
             self._variables = []
@@ -251,16 +1224,23 @@ class PyUNOWorkspaceProxy(QtCore.QObject):
             self._uno_dict = {}
 
         elif shell._state.lower() != "busy":
-            # via pyzo
-            future = shell._request.dir2(self._name)
-            future.add_done_callback(self.processResponse)
+            # code ran in the shell, refresh when shown and idle
+            self._dirty = True
+            self._counts["changes"] += 1
+            if self._shown:
+                self.scheduleRefresh()
 
     def processResponse(self, future):
         """ processResponse(response)
         We got a response, update our list and notify the tree.
         """
 
-        response = []
+        # response for an older request, the kernel cancels its job
+        if future._request_id != self._request_id:
+            self._counts["dropped"] += 1
+            return
+
+        response = None
 
         # Process future
         if future.cancelled():
@@ -270,34 +1250,167 @@ class PyUNOWorkspaceProxy(QtCore.QObject):
         else:
             response = future.result()
 
-        # Introspection via pyzo
-        self._variables = response
+        if isinstance(response, dict) and "job" in response:
+            # chunks of a background inspection
+            previous = self._response
+            first = previous is None or previous["job"] != response["job"]
+            self._streaming = not response["done"]
+            if first:
+                # values of a refreshed object are kept until they arrive
+                if previous is not None and previous["name"] != self._name:
+                    previous = None
+                self._response = self.mergeChunks(None, response, previous)
+                self._response["name"] = self._name
+            else:
+                self._response = self.mergeChunks(self._response, response)
+            error = self._response.get("error")
+            if error and not self._streaming:
+                # the job failed, the members received so far are shown
+                print("Introspect-inspection-exception: ", error)
+                pyzo.main.statusBar().showMessage(
+                    "Inspection of {} failed: {}".format(self._name, error), 5000
+                )
+            if response["chunks"] or not self._streaming:
+                self._variables, self._uno_dict = self.parseResponse(self._response)
+                self.haveNewData.emit()
+            if self._streaming:
+                self.requestChunks(response["job"])
+            else:
+                self._poll_job = None
+                if not error:
+                    self.storeSnapshot()
+                self.requestWatch()
+            return
 
-        # Introspection via unoinspect - read json
-        with open(RESULT_JSON) as resultf:
-            self._uno_dict = load(resultf)
+        self._response = None
+        self._streaming = False
+        self._variables, self._uno_dict = self.parseResponse(response)
         self.haveNewData.emit()
-
-
-class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
+        # an answer of pyzo's dir2, not an error message
+        if isinstance(response, (list, tuple)):
+            self.storeSnapshot()
+
+    @staticmethod
+    def mergeChunks(merged, response, previous=None):
+        """ mergeChunks(merged, response, previous=None)
+        Add the chunks of a poll response to the members received so far.
+        Rows of a later chunk replace rows of the same name. The rows of
+        previous, the same object before a refresh, are shown until their
+        row arrives, a row whose value is not read yet does not replace
+        them. Rows which did not arrive are dropped when the job is done.
+        An error chunk is kept as "error".
+        """
+        if merged is None:
+            merged = {
+                "job": response["job"],
+                "rows": OrderedDict(),
+                "received": set(),
+                "containers": {},
+                "decl": {},
+                "types": [],
+                "deferred": [],
+                "summaries": {},
+                "error": None,
+            }
+            if previous is not None:
+                merged["rows"].update(previous["rows"])
+                merged["summaries"].update(previous["summaries"])
+        rows = merged["rows"]
+        for chunk in response["chunks"]:
+            if "error" in chunk:
+                merged["error"] = chunk["error"]
+                continue
+            for row in chunk.get("rows", []):
+                name = row[0]
+                merged["received"].add(name)
+                if row[3] == PENDING and name in rows:
+                    continue
+                rows[name] = row
+                merged["summaries"].pop(name, None)
+            merged["containers"].update(chunk.get("containers", {}))
+            merged["decl"].update(chunk.get("decl", {}))
+            merged["types"] = chunk.get("types") or merged["types"]
+            merged["deferred"].extend(chunk.get("deferred", []))
+            merged["summaries"].update(chunk.get("summaries", {}))
+        if response["done"] and not merged["error"]:
+            # members which are gone
+            for name in [name for name in rows if name not in merged["received"]]:
+                del rows[name]
+                merged["summaries"].pop(name, None)
+        return merged
+
+    @staticmethod
+    def parseResponse(response):
+        """ parseResponse(response)
+        Return rows [name, type, kind, repr, desc] and member info by name.
+        The response is a list from pyzo's dir2 or a dict from the
+        inspection service. The info of UNO members has the interfaces
+        or services ("types") which document them.
+        """
+        rows = []
+        containers = {}
+        decl = {}
+        types = ()
+        deferred = ()
+        summaries = {}
+
+        if isinstance(response, dict):
+            # via unoinspect
+            rows = response.get("rows", [])
+            if isinstance(rows, dict):
+                # merged chunks
+                rows = rows.values()
+            rows = [list(row) for row in rows]
+            containers = response.get("containers", {})
+            decl = response.get("decl", {})
+            types = tuple(response.get("types", ()))
+            deferred = set(response.get("deferred", ()))
+            summaries = response.get("summaries", {})
+
+        elif isinstance(response, (list, tuple)):
+            # via pyzo
+            for des in response:
+                # Get parts
+                try:
+                    parts = des.split(",", 3)
+                except:
+                    parts = list(des)
+
+                if len(parts) < 4:
+                    continue
+                rows.append([parts[0], parts[1], parts[2], parts[-1], "python"])
+
+        info = {}
+        for name, typ, kind, rep, desc in rows:
+            info[name] = {"desc": desc, "type": typ, "repr": rep}
+            if name in containers:
+                info[name]["container"] = containers[name]
+            if name in decl:
+                # method, documented by its interface
+                info[name]["types"] = (decl[name],)
+            elif desc.startswith("uno"):
+                info[name]["types"] = types
+            if name in deferred:
+                # property over the time budget, read on click
+                info[name]["deferred"] = True
+            if name in summaries:
+                info[name]["summary"] = summaries[name]
+
+        return rows, info
+
+
+class PyUNOWorkspaceTree(QtWidgets.QTreeView):
     """ WorkspaceTree
 
     The tree that displays the items in the current namespace.
-    I first thought about implementing this using the mode/view
-    framework, but it is so much work and I can't seem to fully
-    understand how it works :(
-
-    The QTreeWidget is so very simple and enables sorting very
-    easily, so I'll stick with that ...
+    The rows live in a PyUNOWorkspaceModel, viewed through a
+    PyUNOWorkspaceFilterModel for sorting and filtering, so objects
+    with thousands of members are displayed without stalling.
 
     """
 
     def __init__(self, parent):
-        QtWidgets.QTreeWidget.__init__(self, parent)
-
-        # create JSON serialization file
-        if not os.path.isfile(RESULT_JSON) or not os.path.isfile(RESULT_PICKLE):
-            createResultFile()
+        QtWidgets.QTreeView.__init__(self, parent)
 
         # create history file
         if not os.path.isfile(HISTORY):
@@ -306,27 +1419,51 @@ class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
         self._config = parent._config
         self.old_item = ""
         self._name_item = ""
+        # name of the object shown in the tree
+        self._shown_name = None
+        # history of the shown name is recorded
+        self._navigated = False
+        # container flags shown in the combo boxes
+        self._container_flags = {}
+        # highlight changed rows, not the rows of a new object as they
+        # arrive
+        self._highlight = False
 
         # tree selected item
         self._tree_name = ""
         self._tree_type = ""
         self._tree_repr = ""
 
+        # Documentation lookups
+        self._docs = PyUNODocLoader(self)
+        self._help_cache = HelpCache()
+        self._desc_find = ""
+        self._desc_key = None
+
+        # Create model
+        self._model = PyUNOWorkspaceModel(self)
+        self._filter_model = PyUNOWorkspaceFilterModel(self)
+        self._filter_model.setSourceModel(self._model)
+        self.setModel(self._filter_model)
+
         # Set header stuff
         self.setHeaderHidden(False)
-        self.setColumnCount(3)
-        self.setHeaderLabels(["Name", "Type", "Repr"])
         # Set first column width
         self.setColumnWidth(0, 170)
         self.setSortingEnabled(True)
+        self.sortByColumn(0, QtCore.Qt.AscendingOrder)
 
         # Nice rows
         self.setAlternatingRowColors(True)
         self.setRootIsDecorated(False)
+        self.setUniformRowHeights(True)
 
         # Create proxy
         self._proxy = PyUNOWorkspaceProxy()
         self._proxy.haveNewData.connect(self.fillWorkspace)
+        self._proxy.haveContainerItems.connect(self.fillContainer)
+        for combo in self.containerCombos().values():
+            combo.requestItems.connect(self._proxy.requestContainerItems)
 
         # For menu
         self.setContextMenuPolicy(QtCore.Qt.DefaultContextMenu)
@@ -334,9 +1471,27 @@ class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
         self._menu.triggered.connect(self.contextMenuTriggered)
 
         # Bind to events
-        self.itemActivated.connect(self.onItemExpand)
+        self.activated.connect(self.onItemExpand)
         self.clicked.connect(self.onItemClicked)
 
+    def currentRow(self):
+        """ currentRow()
+        Return (name, type, repr) of the current row or None.
+        """
+        return self._filter_model.sourceRow(self.currentIndex())
+
+    def setFilterText(self, text):
+        """ setFilterText(text)
+        Filter rows by name.
+        """
+        self._filter_model.setFilterText(text)
+
+    def nameIndex(self):
+        """ nameIndex()
+        Prefix index of the names in the tree, for the filter completer.
+        """
+        return self._model.nameIndex()
+
     def contextMenuEvent(self, event):
         """ contextMenuEvent(event)
         Show the context menu.
@@ -345,7 +1500,7 @@ class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
         QtWidgets.QTreeView.contextMenuEvent(self, event)
 
         # Get if an item is selected
-        item = self.currentItem()
+        item = self.currentRow()
         if not item:
             return
 
@@ -368,7 +1523,7 @@ class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
             else:
                 action = self._menu.addAction(a)
                 parts = splitName(self._proxy._name)
-                parts.append(item.text(0))
+                parts.append(item[0])
                 action._objectName = joinName(parts)
                 action._item = item
 
@@ -412,19 +1567,20 @@ class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
             if shell:
                 shell.processLine("del " + action._objectName)
 
-    def onItemExpand(self, item):
-        """ onItemExpand(item)
+    def onItemExpand(self, index):
+        """ onItemExpand(index)
         Inspect the attributes of that item
         Add arguments to item if needed and then inspect the attributes of that item.
         """
-        inspect_item = item.text(0)
+        item = self._filter_model.sourceRow(index)
+        if not item:
+            return
+        inspect_item = item[0]
 
         # if item is UNO method
-        if item.text(0)[0].islower():
+        if item[0][0].islower():
             # get item name and arguments
-            name = item.text(0)
-            typ = item.text(1)
-            rep = item.text(2)
+            name, typ, rep = item
 
             if name == "value" and (typ == "pyuno.struct" or typ == "struct"):
                 pass
@@ -454,148 +1610,148 @@ class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
             # set item for inspection
             self._proxy.addNamePart(inspect_item)
 
-    def resetWidget(self):
+    def containerCombos(self):
+        """ containerCombos()
+        Container combo boxes by method name.
+        """
+        return {
+            "getByName": self.parent()._element_names,
+            "getByIndex": self.parent()._element_index,
+            "createEnumeration": self.parent()._enumerate_index,
+        }
+
+    def resetWidget(self, description=True):
         """ resetWidget
         Reset widgets to default.
         """
-        self.parent()._element_names.clear()
-        self.parent()._element_index.clear()
-        self.parent()._enumerate_index.clear()
-        self.parent()._description.setText(self.parent().initText)
+        for combo in self.containerCombos().values():
+            combo.reset()
+        self._container_flags = {}
+        if description:
+            self.parent()._description.setText(self.parent().initText)
 
         self.parent()._selection.setEnabled(False)
-        self.parent()._element_names.setEnabled(False)
-        self.parent()._element_index.setEnabled(False)
-        self.parent()._enumerate_index.setEnabled(False)
 
     def fillWidget(self):
         """ fillWidget
-        Fill/activate widgets.
+        Activate widgets, container elements are loaded when a combo
+        box is opened. Only the combo boxes whose container flag changed
+        are touched, so a loaded window or an open popup is kept.
         """
+        uno_dict = self._proxy._uno_dict
+        for method, combo in self.containerCombos().items():
+            available = bool(uno_dict.get(method, {}).get("container"))
+            if self._container_flags.get(method, False) == available:
+                continue
+            self._container_flags[method] = available
+            if available:
+                combo.setAvailable(True)
+            else:
+                combo.reset()
 
-        if "getByName" in self._proxy._uno_dict.keys():
-            if self._proxy._uno_dict["getByName"]["items"]:
-                self.parent()._element_names.addItem("--Name--")
-                self.parent()._element_names.addItems(
-                    self._proxy._uno_dict["getByName"]["items"]
-                )
-                self.parent()._element_names.setEnabled(True)
-
-        if "getByIndex" in self._proxy._uno_dict.keys():
-            if self._proxy._uno_dict["getByIndex"]["items"]:
-                self.parent()._element_index.addItem("--Index--")
-                self.parent()._element_index.addItems(
-                    self._proxy._uno_dict["getByIndex"]["items"]
-                )
-                self.parent()._element_index.setEnabled(True)
-
-        if "createEnumeration" in self._proxy._uno_dict.keys():
-            if self._proxy._uno_dict["createEnumeration"]["items"]:
-                self.parent()._enumerate_index.addItem("--Enumeration--")
-                self.parent()._enumerate_index.addItem("All")
-                self.parent()._enumerate_index.addItems(
-                    self._proxy._uno_dict["createEnumeration"]["items"]
-                )
-                self.parent()._enumerate_index.setEnabled(True)
-
-        if "getCurrentSelection" in self._proxy._uno_dict.keys():
-            if self._proxy._uno_dict["getCurrentSelection"]:
-                self.parent()._selection.setEnabled(True)
+        self.parent()._selection.setEnabled(
+            bool(uno_dict.get("getCurrentSelection"))
+        )
 
-    def fillWorkspace(self):
-        """ fillWorkspace()
-        Update the workspace tree.
+    def fillContainer(self, method, page):
+        """ fillContainer(method, page)
+        Fill a window of container elements in the combo box.
+        """
+        combo = self.containerCombos().get(method)
+        if combo is not None and combo.isEnabled():
+            combo.setItems(page)
+
+    def fillWorkspace(self, update=True):
+        """ fillWorkspace(update=True)
+        Update the workspace tree. If the same object is shown again
+        and update is True, rows are patched instead of rebuilt.
         """
 
-        # Clear tree and widget first
-        self.clear()
-        self.resetWidget()
+        # Same object again (refresh, chunk, patch), update rows in place
+        update = update and self._shown_name == self._proxy._name
+        self._shown_name = self._proxy._name
 
-        # Set name
-        line = self.parent()._line
-        line.setText(self._proxy._name)
+        if not update:
+            # Reset widget first
+            self.resetWidget()
+            self._navigated = False
 
-        # Fill history and widgets
-        if line.text():
-            self.parent().onAddToHistory(line.text().strip())
-        self.fillWidget()
-
-        # Add elements
-        for des in self._proxy._variables:
+            # Set name
+            self.parent()._line.setText(self._proxy._name)
+            self.parent().forward.setEnabled(bool(self._proxy._forward))
 
-            # Get parts
-            try:
-                parts = des.split(",", 4)
-            except:
-                parts = list(des)
+        # Fill widgets
+        self.fillWidget()
 
-            if len(parts) < 4:
-                continue
-            # -- Name --
-            name = parts[0]
-            # -- Type, Repr --
-            if name in self._proxy._uno_dict.keys():
-                typ = str(self._proxy._uno_dict[name]["type"])
-                rep = str(self._proxy._uno_dict[name]["repr"])
-            else:
-                typ = parts[1]
-                rep = parts[-1]
+        # History and status once, when the navigation has finished
+        finished = not (self._navigated or self._proxy._streaming)
+        if finished:
+            self._navigated = True
+            name = self._proxy._name.strip()
+            if name:
+                self.parent().onAddToHistory(name)
 
-            # Pop the 'kind' element
-            kind = parts.pop(2)
+        # Add elements
+        rows = []
+        for name, typ, kind, rep, desc in self._proxy._variables:
 
             if kind in self._config.hideTypes:
                 continue
             if name.startswith("_") and "private" in self._config.hideTypes:
                 continue
-            if name == "ImplementationName":
+            if name == "ImplementationName" and finished:
                 pyzo.main.statusBar().showMessage(rep, 5000)
             if rep.startswith("pyuno object ("):
                 rep = "pyuno object"
 
-            # Create item
-            item = PyUNOWorkspaceItem([name, typ, rep], 0)
-            # item = PyUNOWorkspaceItem(parts, 0)
-            self.addTopLevelItem(item)
+            rows.append((name, typ, rep))
 
-            # Set background color
-            # item.setBackground(0, QtGui.QColor(255, 255, 255))
-            # item.setBackground(1, QtGui.QColor(255, 255, 255))
-            # item.setBackground(2, QtGui.QColor(255, 255, 255))
+        # numeric summaries
+        tooltips = {}
+        for name, info in self._proxy._uno_dict.items():
+            if "summary" in info:
+                tooltips[name] = formatSummary(info["summary"])
+        self._model.setToolTips(tooltips)
 
-            # Set tooltip
-            # tt = "%s: %s" % (parts[0], parts[-1])
-            # item.setToolTip(0, tt)
-            # item.setToolTip(1, tt)
-            # item.setToolTip(2, tt)
-
-        # scroll on the start
-        self.scrollToItem(self.topLevelItem(0))
+        if update:
+            self._model.updateRows(rows, highlight=self._highlight)
+        else:
+            self._model.setRows(rows)
+            # scroll on the start
+            self.scrollToTop()
+        self._highlight = update and self._highlight or not self._proxy._streaming
+        if self._filter_model.filterText():
+            self._model.fetchAll()
 
         self.parent().displayEmptyWorkspace(
-            self.topLevelItemCount() == 0 and self._proxy._name == ""
+            self._model.totalCount() == 0 and self._proxy._name == ""
         )
 
     def onItemClicked(self):
         """ onItemClicked()
         If item clicked in the workspace tree show help
         """
-        # Clear
+        # Clear, a running UNO help lookup must not overwrite the new help
+        self._docs.cancel()
         self.parent()._description.clear()
         self._tree_name = ""
         self._tree_type = ""
         self._tree_repr = ""
 
         # Get tree items
-        items = self.currentItem()
+        items = self.currentRow()
+        if not items:
+            return
 
         # store tree items in vars
-        self._tree_name = str(items.data(0, 0))
-        self._tree_type = str(items.data(1, 0))
-        self._tree_repr = str(items.data(2, 0))
+        self._tree_name, self._tree_type, self._tree_repr = items
 
         # Find documentation for this item
-        find = str(items.data(0, 0))
+        find = self._tree_name
+
+        # Load a property which was too slow to read
+        if self._proxy._uno_dict.get(find, {}).get("deferred"):
+            self._proxy.requestProperty(find)
 
         try:
             kind = str(self._proxy._uno_dict[find]["desc"])
@@ -605,8 +1761,9 @@ class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
                 self.unoDescriptions(find)
             else:
                 # Python
-                find = self.parent()._line.text() + "." + find
-                self.queryDoc(find)
+                parts = splitName(self.parent()._line.text())
+                parts.append(find)
+                self.queryDoc(joinName(parts))
         except:
             t = "No information is available for: {}".format(find)
             self.parent()._description.setText(t)
@@ -681,98 +1838,56 @@ class PyUNOWorkspaceTree(QtWidgets.QTreeWidget):
                 self.parent()._description.setText(txt)
 
     def unoDescriptions(self, find):
-        """ Process UNO documentation. """
-
-        if find.startswith("get"):
-            getfind = find.replace("get", "")
-        else:
-            getfind = "get" + find
-
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT signature, description, reference FROM UNOtable WHERE name=? OR name =?",
-            (find, getfind),
-        )
-        rows = cur.fetchall()
-        if rows:
-            self.parent()._desc_all_items.setText(str(len(rows)))
-            self.parent()._desc_counter.setText("0")
-
-            # set font size
-            font = self.parent()._description.font()
-            font.setPointSize(self._config.fontSizeHelp)
-            self.parent()._description.setFont(QtGui.QFont(font))
-
-            try:
-                n = 0
-                ok_counter = 0
-                good = ""
-                bad = ""
-                for sig, desc, ref in rows:
-                    desc = desc + "&newline&Reference &newline&" + ref
-                    sig, desc = formatReference(sig, desc, bold=[find, getfind])
-
-                    # signature color
-                    sig_OK = False
-                    if len(rows) == 1:
-                        # if only one result, color green
-                        sig = "<p style = 'background-color: palegreen'>{}</p>".format(
-                            sig
-                        )
-                        ok_counter += 1
-                        sig_OK = True
+        """ Process UNO documentation, the lookup runs in a worker. """
 
-                    elif self._tree_repr in sig:
-                        # if param is OK, color green
-                        sig = "<p style = 'background-color: palegreen'>{}</p>".format(
-                            sig
-                        )
-                        ok_counter += 1
-                        sig_OK = True
-
-                    elif self._tree_repr == "pyuno object" and sig.startswith(
-                        "com.sun.star" + self._tree_type
-                    ):
-                        # if param is OK, color green
-                        sig = "<p style = 'background-color: palegreen'>{}</p>".format(
-                            sig
-                        )
-                        ok_counter += 1
-                        sig_OK = True
+        types = self._proxy._uno_dict.get(find, {}).get("types", ())
+        self._desc_find = find
+        self._desc_key = (find, self._tree_repr, self._tree_type, types)
 
-                    else:
-                        sig = "<p style = 'background-color: lightgray'>{}</p>".format(
-                            sig
-                        )
-                        sig_OK = False
+        result = self._help_cache.get(self._desc_key)
+        if result is not None:
+            # rendered before, show it now
+            self._docs.cancel()
+            self.unoDescriptions_response(result)
+            return
 
-                    desc = "<p>{}</p>".format(desc)
+        self._docs.request(
+            describe,
+            find,
+            self._tree_repr,
+            self._tree_type,
+            types,
+            callback=self.unoDescriptions_response,
+        )
 
-                    if sig_OK:
-                        good = good + sig + desc
-                    else:
-                        bad = bad + sig + desc
+    def unoDescriptions_response(self, result):
+        """ Show UNO documentation rendered by the worker. """
 
-                    sig = ""
-                    desc = ""
-                    # set font size
-                    font = self.parent()._description.font()
-                    font.setPointSize(self._config.fontSizeHelp)
-                    self.parent()._description.setFont(QtGui.QFont(font))
+        if result is None:
+            t = "No information is available for: {}".format(self._desc_find)
+            self.parent()._description.setText(t)
+            return
 
-                    n += 1
+        self._help_cache.put(self._desc_key, result)
+        txt, all_items, ok_counter = result
+        self.parent()._desc_all_items.setText(str(all_items))
 
-                # show description
-                txt = good + bad
+        # set font size
+        font = self.parent()._description.font()
+        font.setPointSize(self._config.fontSizeHelp)
+        self.parent()._description.setFont(QtGui.QFont(font))
 
-                self.parent()._description.setText(txt)
-                self.parent()._desc_counter.setText(str(ok_counter))
-            except Exception as err:
-                print(err)
+        # show description
+        self.parent()._description.setText(txt)
+        self.parent()._desc_counter.setText(str(ok_counter))
 
-        else:
-            t = "No information is available for: {}".format(find)
-            self.parent()._description.setText(t)
+        stats = self._help_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        self.parent()._desc_counter.setToolTip(
+            "Help cache: {} hits of {} ({:.0f}%)".format(
+                stats["hits"], lookups, 100.0 * stats["hits"] / lookups
+            )
+        )
 
 
 class InputDialog(QtWidgets.QDialog):
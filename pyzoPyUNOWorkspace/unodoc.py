@@ -0,0 +1,523 @@
+# -*- coding: utf-8 -*-
+# PyUNO Workspace UNO API documentation helper module
+from bisect import bisect_left
+from functools import lru_cache
+import heapq
+from inspect import getsourcefile
+import os
+import re
+import sqlite3
+import threading
+from urllib.request import pathname2url
+
+from .utils import LRUCache
+
+# Documentation database
+UNODOC_DB = os.path.join(
+    os.path.dirname(os.path.abspath(getsourcefile(lambda: 0))), "unoDoc.db"
+)
+
+# Full-text index of UNOtable
+SEARCH_TABLE = "UNOsearch"
+SEARCH_LIMIT = 200
+# bm25 weights of name, words, signature, description
+SEARCH_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+SNIPPET_START = '<span style="background-color: yellow">'
+SNIPPET_END = "</span>"
+# Number of completions
+COMPLETE_LIMIT = 20
+
+# Documented members by declaring interface or service
+MEMBER_TABLE = "UNOmember"
+# Declaring type in a reference url, eg. interfacecom_1_1sun_1_1star_1_1...
+_REFERENCE_TYPE = re.compile(
+    r"(?:interface|service|struct|exception|singleton)"
+    r"(com_1_1sun_1_1star(?:_1_1\w+?)+)\.html"
+)
+# Declaring type in a signature, eg. com.sun.star.container.XNameAccess::
+_SIGNATURE_TYPE = re.compile(r"com\.sun\.star(?:\.\w+)+(?=::)")
+
+# Number of rendered help kept
+HELP_CACHE_SIZE = 128
+
+# Formatting of the references
+_RAISES = r"(?:set |get )?raises"
+_DESCRIPTION_TAGS = {}
+for _word in ["Parameters", "Exceptions", "Returns", "Enumerator"]:
+    # bold
+    _DESCRIPTION_TAGS[_word] = "<p style='font-weight:bold'>{}</p>".format(_word)
+for _word in ["See also", "See Also", "Reference"]:
+    # bold blue
+    _DESCRIPTION_TAGS[_word] = "<p style='font-weight:bold;color:blue'>{}</p>".format(
+        _word
+    )
+for _word in ["Deprecated", "Attention"]:
+    # bold red
+    _DESCRIPTION_TAGS[_word] = '<span style="font-weight:bold;color:red">{}</span>'.format(
+        _word
+    )
+# paragraphs, a double newline is one paragraph
+_DESCRIPTION_PATTERN = re.compile(
+    r"(?:&newline&){{1,2}}|\b(?:{})\b".format("|".join(_DESCRIPTION_TAGS))
+)
+
+# NameIndex of all UNOtable names, loaded on first use
+_NAME_INDEX = None
+
+# Memory map of the database, in bytes
+MMAP_SIZE = 256 * 1024 * 1024
+# Prepared statements kept by each connection
+CACHED_STATEMENTS = 64
+
+# Queries, constant strings so the prepared statements are reused
+SQL_DESCRIBE = (
+    "SELECT signature, description, reference FROM UNOtable WHERE name=? OR name=?"
+)
+SQL_NAME = "SELECT signature, description, reference FROM UNOtable WHERE name=?"
+SQL_LIKE = "SELECT signature, description, reference FROM UNOtable WHERE name LIKE ?"
+SQL_NAMES = "SELECT DISTINCT name FROM UNOtable"
+SQL_MEMBER = (
+    "SELECT u.signature, u.description, u.reference "
+    "FROM {} m JOIN UNOtable u ON u.rowid = m.ref "
+    "WHERE m.name IN (?, ?) AND m.type IN ({{}})".format(MEMBER_TABLE)
+)
+SQL_SEARCH = (
+    "SELECT u.signature, u.description, u.reference, "
+    "snippet({0}, 3, ?, ?, '...', 24) "
+    "FROM {0} JOIN UNOtable u ON u.rowid = {0}.rowid "
+    "WHERE {0} MATCH ? "
+    "ORDER BY bm25({0}, ?, ?, ?, ?) LIMIT ?".format(SEARCH_TABLE)
+)
+
+# Connections of the threads
+_LOCAL = threading.local()
+# Index tables checked or built, {table: available}
+_TABLES = {}
+# Indexes are checked once, by the first connection
+_INDEX_LOCK = threading.Lock()
+_INDEXED = False
+
+
+def isWritable(path=UNODOC_DB):
+    """ isWritable(path=UNODOC_DB)
+    True if the database and its directory (for the journal) can be
+    written, eg. not in a read-only install.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    return os.access(path, os.W_OK) and os.access(directory, os.W_OK)
+
+
+def ensureNameIndex(path=UNODOC_DB):
+    """ ensureNameIndex(path=UNODOC_DB)
+    Create the index on UNOtable.name if the database is writable, it is
+    skipped quietly if not. Called by the documentation worker, so the
+    GUI thread never writes to the database.
+    """
+    global _INDEXED
+    with _INDEX_LOCK:
+        if _INDEXED:
+            return
+        _INDEXED = True
+        if not (os.path.exists(path) and isWritable(path)):
+            return
+        try:
+            writable = sqlite3.connect(path)
+            try:
+                with writable:
+                    writable.execute(
+                        "CREATE INDEX IF NOT EXISTS UNOtable_name ON UNOtable(name)"
+                    )
+            finally:
+                writable.close()
+        except sqlite3.Error as err:
+            print("UNO API name index: ", err)
+
+
+def openConnection(path=UNODOC_DB):
+    """ openConnection(path=UNODOC_DB)
+    Open the documentation database read-only and memory mapped.
+    """
+    uri = "file:{}?mode=ro".format(pathname2url(path))
+    conn = sqlite3.connect(uri, uri=True, cached_statements=CACHED_STATEMENTS)
+    conn.execute("PRAGMA mmap_size={:d}".format(MMAP_SIZE))
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+def getConnection():
+    """ getConnection()
+    Connection of the calling thread, opened on first use. SQLite
+    connections must not be shared between threads.
+    """
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is None:
+        conn = openConnection()
+        _LOCAL.conn = conn
+    return conn
+
+
+@lru_cache(maxsize=64)
+def _boldPattern(words):
+    """ _boldPattern(words)
+    Compiled pattern of the signature: the bold words and the raises
+    clauses.
+    """
+    words = "|".join(re.escape(w) for w in words if w)
+    if words:
+        return re.compile(r"\b(?:{})\b|{}".format(words, _RAISES))
+    return re.compile(_RAISES)
+
+
+def _formatSignature(match):
+    text = match.group(0)
+    if text.endswith("raises"):
+        return '<span style="font-weight:bold;color:red">{}</span>'.format(text)
+    return "<strong>{}</strong>".format(text)
+
+
+def _formatDescription(match):
+    return _DESCRIPTION_TAGS.get(match.group(0), "<p></p>")
+
+
+def formatReference(signature, description, bold=[]):
+    """ formatReference(signature, description, bold=[])
+    HTML of a signature and its description, each formatted in a single
+    pass of a precompiled pattern.
+    """
+    signature = signature.replace("&newline&", "\n")
+    signature = _boldPattern(tuple(bold)).sub(_formatSignature, signature)
+    description = _DESCRIPTION_PATTERN.sub(_formatDescription, description)
+    return signature, description
+
+
+class HelpCache(LRUCache):
+    """ HelpCache
+
+    LRU cache of rendered help, keyed by the name and the context that
+    colors the matching signatures (repr and type of the selected item).
+
+    """
+
+    def __init__(self, maxsize=HELP_CACHE_SIZE):
+        LRUCache.__init__(self, maxsize)
+
+
+def splitWords(name):
+    """ splitWords(name)
+    Split a camel case name in words, eg. 'getCellRangeByName' gives
+    'get Cell Range By Name', so the words can be searched.
+    """
+    return " ".join(re.findall(r"[A-Z]+(?![a-z])|[A-Z]?[a-z0-9]+", name))
+
+
+def ftsQuery(text):
+    """ ftsQuery(text)
+    FTS5 query for the words in text, every word is a quoted prefix.
+    A camel case word is split like the names in the words column, eg.
+    'ByName' gives the phrase "By Name"*.
+    """
+    words = re.findall(r"\w+", text)
+    return " ".join('"{}"*'.format(splitWords(word) or word) for word in words)
+
+
+def hasTable(conn, table):
+    """ hasTable(conn, table)
+    True if the table exists.
+    """
+    cur = conn.execute(
+        "SELECT count(*) FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    )
+    return bool(cur.fetchone()[0])
+
+
+def hasSearchIndex(conn):
+    """ hasSearchIndex(conn)
+    True if the full-text index exists.
+    """
+    return hasTable(conn, SEARCH_TABLE)
+
+
+def createSearchIndex(conn):
+    """ createSearchIndex(conn)
+    Build the FTS5 index from UNOtable (name, camel case words of the
+    name, signature and description). Return False if SQLite has no FTS5
+    or the database is read-only.
+    """
+    try:
+        with conn:
+            conn.execute(
+                "CREATE VIRTUAL TABLE {} USING fts5("
+                "name, words, signature, description)".format(SEARCH_TABLE)
+            )
+            rows = conn.execute(
+                "SELECT rowid, name, signature, description FROM UNOtable"
+            )
+            conn.executemany(
+                "INSERT INTO {}(rowid, name, words, signature, description) "
+                "VALUES (?, ?, ?, ?, ?)".format(SEARCH_TABLE),
+                (
+                    (rowid, name, splitWords(name or ""), sig, desc)
+                    for rowid, name, sig, desc in rows.fetchall()
+                ),
+            )
+            conn.execute(
+                "INSERT INTO {0}({0}) VALUES ('optimize')".format(SEARCH_TABLE)
+            )
+    except sqlite3.Error as err:
+        print("UNO API search index: ", err)
+        return False
+    return True
+
+
+def ensureTable(conn, table, create):
+    """ ensureTable(conn, table, create)
+    Create an index table on first use with create(connection), using a
+    writable connection because conn may be read-only. The build is
+    skipped if the database is not writable. The result is remembered,
+    so a failed build is not tried again.
+    Return True if the table exists.
+    """
+    if table not in _TABLES:
+        if hasTable(conn, table):
+            _TABLES[table] = True
+        elif not isWritable():
+            _TABLES[table] = False
+        else:
+            writable = sqlite3.connect(UNODOC_DB)
+            try:
+                _TABLES[table] = create(writable)
+            finally:
+                writable.close()
+    return _TABLES[table]
+
+
+def ensureSearchIndex(conn):
+    """ ensureSearchIndex(conn)
+    Create the full-text index on first use. Return True if it exists.
+    """
+    return ensureTable(conn, SEARCH_TABLE, createSearchIndex)
+
+
+def declaringType(signature, reference):
+    """ declaringType(signature, reference)
+    Qualified name of the interface or service which declares a member,
+    from its reference url or its signature. Return "" if not found.
+    """
+    m = _REFERENCE_TYPE.search(reference or "")
+    if m:
+        return m.group(1).replace("_1_1", ".")
+    m = _SIGNATURE_TYPE.search(signature or "")
+    if m:
+        return m.group(0)
+    return ""
+
+
+def createMemberIndex(conn):
+    """ createMemberIndex(conn)
+    Build the member index, UNOtable rows by (name, declaring type).
+    Return False if the database is read-only.
+    """
+    try:
+        with conn:
+            conn.execute(
+                "CREATE TABLE {}(name TEXT, type TEXT, ref INTEGER)".format(
+                    MEMBER_TABLE
+                )
+            )
+            rows = conn.execute(
+                "SELECT rowid, name, signature, reference FROM UNOtable"
+            )
+            conn.executemany(
+                "INSERT INTO {}(name, type, ref) VALUES (?, ?, ?)".format(
+                    MEMBER_TABLE
+                ),
+                (
+                    (name, declaringType(sig, ref), rowid)
+                    for rowid, name, sig, ref in rows.fetchall()
+                ),
+            )
+            conn.execute(
+                "CREATE INDEX {0}_name_type ON {0}(name, type)".format(MEMBER_TABLE)
+            )
+    except sqlite3.Error as err:
+        print("UNO API member index: ", err)
+        return False
+    return True
+
+
+def ensureMemberIndex(conn):
+    """ ensureMemberIndex(conn)
+    Create the member index on first use. Return True if it exists.
+    """
+    return ensureTable(conn, MEMBER_TABLE, createMemberIndex)
+
+
+def searchAPI(conn, text, limit=SEARCH_LIMIT):
+    """ searchAPI(conn, text, limit=SEARCH_LIMIT)
+    Search names, signatures and descriptions, best matches first.
+    Return rows (signature, description, reference, snippet), the snippet
+    is the matching part of the description with highlighted words, in a
+    column of its own.
+    Return None if there is no full-text index.
+    """
+    query = ftsQuery(text)
+    if not query:
+        return []
+    if not ensureSearchIndex(conn):
+        return None
+
+    cur = conn.execute(
+        SQL_SEARCH,
+        (SNIPPET_START, SNIPPET_END, query) + SEARCH_WEIGHTS + (limit,),
+    )
+    return cur.fetchall()
+
+
+class NameIndex:
+    """ NameIndex
+
+    In-memory prefix index of names, a sorted array searched with bisect.
+    Completions are case insensitive and ranked: matching case first,
+    then shorter names, then alphabetical.
+
+    """
+
+    def __init__(self, names):
+        names = sorted(set(name for name in names if name), key=str.lower)
+        self._names = names
+        self._lower = [name.lower() for name in names]
+
+    def __len__(self):
+        return len(self._names)
+
+    def complete(self, prefix, limit=COMPLETE_LIMIT):
+        """ complete(prefix, limit=COMPLETE_LIMIT)
+        Return ranked names starting with prefix.
+        """
+        if not prefix:
+            return []
+        low = prefix.lower()
+        start = bisect_left(self._lower, low)
+        stop = bisect_left(self._lower, low + "\uffff", start)
+        return heapq.nsmallest(
+            limit,
+            self._names[start:stop],
+            key=lambda name: (not name.startswith(prefix), len(name), name),
+        )
+
+
+def getNameIndex(conn):
+    """ getNameIndex(conn)
+    NameIndex of the distinct UNOtable names, loaded once.
+    """
+    global _NAME_INDEX
+    if _NAME_INDEX is None:
+        cur = conn.execute(SQL_NAMES)
+        _NAME_INDEX = NameIndex(row[0] for row in cur.fetchall())
+    return _NAME_INDEX
+
+
+def describe(conn, find, tree_repr="", tree_type="", types=(), cancelled=None):
+    """ describe(conn, find, tree_repr="", tree_type="", types=(), cancelled=None)
+    HTML documentation of a UNO member. With types, the interfaces or
+    services of the object, only their rows are shown. Else signatures
+    matching the selected item (its repr or type) are colored green and
+    shown first.
+    Return (html, number of rows, number of matching rows) or None.
+    """
+    if find.startswith("get"):
+        getfind = find.replace("get", "")
+    else:
+        getfind = "get" + find
+
+    rows = []
+    if types and ensureMemberIndex(conn):
+        # the rows of this member, all matching
+        sql = SQL_MEMBER.format(", ".join("?" * len(types)))
+        cur = conn.execute(sql, (find, getfind) + tuple(types))
+        rows = cur.fetchall()
+        if rows:
+            tree_repr = tree_type = None
+
+    if not rows:
+        cur = conn.execute(SQL_DESCRIBE, (find, getfind))
+        rows = cur.fetchall()
+        if not rows:
+            return None
+
+    ok_counter = 0
+    good = ""
+    bad = ""
+    for sig, desc, ref in rows:
+        if cancelled is not None and cancelled():
+            return None
+
+        desc = desc + "&newline&Reference &newline&" + ref
+        sig, desc = formatReference(sig, desc, bold=[find, getfind])
+
+        # signature color
+        if tree_repr is None:
+            # found by type
+            sig_OK = True
+        elif len(rows) == 1:
+            # if only one result, color green
+            sig_OK = True
+        elif tree_repr in sig:
+            # if param is OK, color green
+            sig_OK = True
+        elif tree_repr == "pyuno object" and sig.startswith(
+            "com.sun.star" + tree_type
+        ):
+            # if param is OK, color green
+            sig_OK = True
+        else:
+            sig_OK = False
+
+        desc = "<p>{}</p>".format(desc)
+        if sig_OK:
+            sig = "<p style = 'background-color: palegreen'>{}</p>".format(sig)
+            good = good + sig + desc
+            ok_counter += 1
+        else:
+            sig = "<p style = 'background-color: lightgray'>{}</p>".format(sig)
+            bad = bad + sig + desc
+
+    return good + bad, len(rows), ok_counter
+
+
+def renderSearch(conn, search, match=True, cancelled=None):
+    """ renderSearch(conn, search, match=True, cancelled=None)
+    HTML of an UNO API search. With match the name must be equal to
+    search, else a full-text search is done, or a substring search if it
+    finds nothing.
+    Return (html, number of results).
+    """
+    if match:
+        cur = conn.execute(SQL_NAME, (search,))
+        rows = [row + (None,) for row in cur.fetchall()]
+    else:
+        # full-text search, best matches first, else substrings
+        rows = searchAPI(conn, search)
+        if not rows:
+            cur = conn.execute(SQL_LIKE, ("%" + search + "%",))
+            rows = [row + (None,) for row in cur.fetchall()]
+
+    res = ""
+    n = 0
+    bold = re.findall(r"\w+", search)
+    for sig, desc, ref, snippet in rows:
+        if cancelled is not None and cancelled():
+            return None
+
+        desc = desc + "&newline&Reference &newline&" + ref
+        sig, desc = formatReference(sig, desc, bold=bold)
+        sig = "<p style = 'background-color: lightgray'>{}</p>".format(sig)
+        if snippet is not None:
+            # matching part of the description, next to the description
+            sig = sig + "<p><em>Match:</em> {}</p>".format(
+                snippet.replace("&newline&", " ")
+            )
+        res = res + sig + desc
+        n += 1
+
+    return res, n
@@ -19,20 +19,53 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
 
 import argparse
+import builtins
+from collections import ChainMap, OrderedDict
+from concurrent.futures import Future, TimeoutError as _Timeout
+from functools import lru_cache
 from json import dump
 import pickle
 from inspect import getsourcefile, signature
 import os
+import queue
+import threading
+import time
 from os.path import abspath, dirname, join, realpath, exists
 
 import uno
+import unohelper
+from com.sun.star.beans import XPropertyChangeListener
 from com.sun.star.beans.MethodConcept import ALL as _METHOD_CONCEPT_ALL
+from com.sun.star.beans.PropertyAttribute import BOUND as _BOUND
 from com.sun.star.beans.PropertyConcept import ALL as _PROPERTY_CONCEPT_ALL
+from com.sun.star.lang import DisposedException
 from com.sun.star.reflection.ParamMode import (
     IN as _PARAM_MODE_IN,
     OUT as _PARAM_MODE_OUT,
     INOUT as _PARAM_MODE_INOUT,
 )
+from com.sun.star.uno import RuntimeException
+from com.sun.star.util import XModifyListener
+
+try:
+    from .utils import LRUCache
+except ImportError:
+    # imported in the shell as a top-level module, use the utils.py next
+    # to this file, not a 'utils' module found on sys.path
+    import importlib.util
+
+    _spec = importlib.util.spec_from_file_location(
+        "_pyuno_workspace_utils",
+        join(dirname(abspath(getsourcefile(lambda: 0))), "utils.py"),
+    )
+    _utils = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_utils)
+    LRUCache = _utils.LRUCache
+
+try:
+    import numpy as _numpy
+except ImportError:
+    _numpy = None
 
 _PATH = abspath(getsourcefile(lambda: 0))
 # output file path
@@ -42,6 +75,72 @@ _PICKLE_FILE = "result.pkl"
 
 _DEBUG = False
 
+# methods whose elements are listed on demand
+_CONTAINER_METHODS = ("getByName", "getByIndex", "createEnumeration")
+
+# default window size for container elements
+_PAGE_SIZE = 200
+
+# maximum number of cached introspection schemas
+_SCHEMA_CACHE_SIZE = 256
+
+# maximum number of cached intermediate objects
+_PATH_CACHE_SIZE = 64
+
+# name of the parent object when a path part is evaluated
+_PARENT = "__pyuno_workspace_parent__"
+
+# default time budget to read one property, in seconds, 0 is no budget
+_PROPERTY_TIMEOUT = 0.5
+
+# a batch read gets the budget of this many properties
+_BATCH_TIMEOUT_FACTOR = 4
+
+# interface to read many property values in one call
+_MULTI_PROPERTY_SET = "com.sun.star.beans.XMultiPropertySet"
+
+# number of properties read per chunk of a background inspection
+_CHUNK_SIZE = 25
+
+# seconds a poll waits for the next chunk, the workspace polls again on
+# a timer, so the request thread of the shell is not blocked
+_POLL_WAIT = 0
+
+# repr of a property whose value is not read yet
+_PENDING = "..."
+
+# seconds between polls of a watch, first and longest
+_WATCH_INTERVAL = (0.5, 8.0)
+
+# repr of a property which was too slow to read
+_DEFERRED = "deferred \u2014 click to load"
+
+# value of a property which can not be read
+_UNKNOWN = object()
+
+# maximum length of a value repr
+_REPR_LIMIT = 120
+
+# value renderers by TypeClass name, see _renderer
+_RENDERERS = {}
+
+# numeric sequences summarised with numpy, see _summarize
+_ARRAY_TYPES = ("[]double", "[][]double", "[][]any")
+
+# rows and columns in the preview of a summary
+_PREVIEW_SIZE = 3
+
+# inspection engines, 'auto' uses reflection when it lists the same members
+_ENGINES = ("auto", "introspection", "reflection")
+_ENGINE = "auto"
+
+# engine of 'auto' by supported types, checked by benchmarkEngines
+_AUTO_ENGINES = {}
+
+# interfaces which decide the engine
+_TYPE_PROVIDER = "com.sun.star.lang.XTypeProvider"
+_INVOCATION = "com.sun.star.script.XInvocation"
+
 # print('**********************')
 # print('_PATH = ' + _PATH)
 # print('_DIR = ' + _DIR)
@@ -60,6 +159,546 @@ def _mode_to_str(mode):
     return ret
 
 
+def _params_to_str(args, infos):
+    """Format method parameters eg. '( [in] string aName )'"""
+    params = "( "
+    for i in range(0, len(args)):
+
+        params = (
+            params
+            + _mode_to_str(infos[i].aMode)
+            + " "
+            + str(args[i].Name)
+            + " "
+            + str(infos[i].aName)
+            + ", "
+        )
+
+    params = params + ")"
+    params = params.replace(", )", " )")
+    return params
+
+
+def _renderer(*type_classes):
+    """Register a value renderer for TypeClass names
+
+    A renderer is called with (value, type name, limit) and must not build
+    a string much longer than limit.
+    """
+
+    def register(function):
+        for type_class in type_classes:
+            _RENDERERS[type_class] = function
+        return function
+
+    return register
+
+
+@lru_cache(maxsize=1024)
+def _type_class(type_name):
+    """Return TypeClass name of a UNO type name eg. 'SEQUENCE'"""
+    try:
+        return str(uno.getTypeByName(type_name).typeClass.value)
+    except Exception:
+        return "ANY"
+
+
+def _value_type_class(value):
+    """Return TypeClass name of a value of type any"""
+    if value is None:
+        return "VOID"
+    elif isinstance(value, bool):
+        return "BOOLEAN"
+    elif isinstance(value, str):
+        return "STRING"
+    elif isinstance(value, (int, float)):
+        return "DOUBLE"
+    elif isinstance(value, (tuple, list, uno.ByteSequence)):
+        return "SEQUENCE"
+    elif isinstance(value, uno.Enum):
+        return "ENUM"
+    elif isinstance(value, uno.Type):
+        return "TYPE"
+    elif isinstance(value, uno.Char):
+        return "CHAR"
+
+    name = type(value).__name__
+    if "struct" in name.lower():
+        return "STRUCT"
+    elif name == "pyuno":
+        return "INTERFACE"
+    return "ANY"
+
+
+@lru_cache(maxsize=256)
+def _struct_fields(type_name):
+    """Return ((field name, field type name), ...) of a struct type"""
+    try:
+        ctx = uno.getComponentContext()
+        reflection = ctx.getValueByName(
+            "/singletons/com.sun.star.reflection.theCoreReflection"
+        )
+        fields = reflection.forName(type_name).getFields()
+        return tuple((str(f.Name), str(f.getType().getName())) for f in fields)
+    except Exception:
+        return ()
+
+
+def _clip(rep, limit):
+    return (rep[:limit] + "..") if len(rep) > limit else rep
+
+
+def _render(value, type_name="any", limit=_REPR_LIMIT):
+    """Return workspace repr of a UNO value, at most about limit characters
+
+    The renderer is chosen by the TypeClass of type_name, or of the value
+    if its type is any. A struct of type any is rendered by its own type.
+    """
+    type_class = _type_class(type_name)
+    if type_class in ("ANY", "VOID"):
+        type_class = _value_type_class(value)
+        if type_class in ("STRUCT", "EXCEPTION"):
+            type_name = str(getattr(value, "typeName", type_name))
+    elif value is None:
+        type_class = "VOID"
+    render = _RENDERERS.get(type_class, _render_other)
+    return _clip(render(value, type_name, limit), limit)
+
+
+@_renderer("VOID")
+def _render_void(value, type_name, limit):
+    return "None"
+
+
+@_renderer("BOOLEAN")
+def _render_boolean(value, type_name, limit):
+    return "True" if value else "False"
+
+
+@_renderer(
+    "BYTE",
+    "SHORT",
+    "UNSIGNED_SHORT",
+    "LONG",
+    "UNSIGNED_LONG",
+    "HYPER",
+    "UNSIGNED_HYPER",
+    "FLOAT",
+    "DOUBLE",
+)
+def _render_number(value, type_name, limit):
+    return str(value)
+
+
+@_renderer("CHAR")
+def _render_char(value, type_name, limit):
+    return "'{}'".format(getattr(value, "value", value))
+
+
+@_renderer("STRING")
+def _render_string(value, type_name, limit):
+    return "'{}'".format(value[: limit + 1])
+
+
+@_renderer("SEQUENCE")
+def _render_sequence(value, type_name, limit):
+    return "< tuple with {} elements >".format(len(value))
+
+
+@_renderer("ENUM")
+def _render_enum(value, type_name, limit):
+    return str(getattr(value, "value", value))
+
+
+@_renderer("TYPE")
+def _render_type(value, type_name, limit):
+    return str(getattr(value, "typeName", value))
+
+
+@_renderer("INTERFACE")
+def _render_interface(value, type_name, limit):
+    return "pyuno object"
+
+
+@_renderer("STRUCT", "EXCEPTION")
+def _render_struct(value, type_name, limit):
+    """Render fields until the limit is reached eg. '(Size){ Width = 0, ... }'"""
+    fields = _struct_fields(type_name)
+    if not fields:
+        return _render_other(value, type_name, limit)
+
+    rep = "({}){{ ".format(type_name.split(".")[-1])
+    for i, (name, field_type) in enumerate(fields):
+        if len(rep) > limit:
+            return rep
+        if i:
+            rep += ", "
+        try:
+            field = _render(getattr(value, name), field_type, limit - len(rep))
+        except Exception:
+            field = "?"
+        rep += "{} = {}".format(name, field)
+    return rep + " }"
+
+
+def _render_other(value, type_name, limit):
+    rep = str(value)
+    return rep.replace("\n", "'\n'")
+
+
+def _number(value):
+    """Return float, None for NaN, so summaries survive repr/eval"""
+    value = float(value)
+    return None if value != value else value
+
+
+def _preview_cell(value):
+    if isinstance(value, float):
+        return _number(value)
+    return value
+
+
+def _summarize(value, type_name):
+    """Summarise a numeric sequence, eg. the DataArray of a cell range
+
+    :param value: sequence of double or sequence of sequences of double/any
+    :param type_name: UNO type name of value
+
+    Return dict with 'shape', 'dtype', 'min', 'max', 'mean', 'nan'
+    (NaN numbers), 'empty' (empty strings), 'text' (other strings) and
+    'preview' (top left values), or None if numpy is not installed or
+    value is not a numeric sequence.
+    """
+    if _numpy is None or type_name not in _ARRAY_TYPES:
+        return None
+
+    try:
+        if type_name.endswith("double"):
+            data = _numpy.array(value, dtype=float)
+            numbers = data
+            empty = text = 0
+        else:
+            data = _numpy.array(value, dtype=object)
+            if data.ndim != 2:
+                # rows of different length
+                return None
+            is_number = _numpy.frompyfunc(
+                lambda x: isinstance(x, (int, float)) and not isinstance(x, bool),
+                1,
+                1,
+            )(data).astype(bool)
+            numbers = data[is_number].astype(float)
+            empty = int(_numpy.count_nonzero(data == ""))
+            text = int(data.size - numbers.size - empty)
+    except Exception as err:
+        if _DEBUG:
+            print(err)
+        return None
+
+    if data.ndim != type_name.count("[]"):
+        return None
+
+    nan = _numpy.isnan(numbers)
+    finite = numbers[~nan]
+    if finite.size:
+        low, high, mean = finite.min(), finite.max(), finite.mean()
+    else:
+        low = high = mean = _numpy.nan
+
+    preview = data[(slice(0, _PREVIEW_SIZE),) * data.ndim].tolist()
+    if data.ndim == 1:
+        preview = [_preview_cell(cell) for cell in preview]
+    else:
+        preview = [[_preview_cell(cell) for cell in row] for row in preview]
+
+    return {
+        "shape": list(data.shape),
+        "dtype": str(data.dtype),
+        "min": _number(low),
+        "max": _number(high),
+        "mean": _number(mean),
+        "nan": int(_numpy.count_nonzero(nan)),
+        "empty": empty,
+        "text": text,
+        "preview": preview,
+    }
+
+
+def _summary_repr(summary):
+    """Return workspace repr of a summary eg. '< 100x3 array, mean 2.5 >'"""
+    shape = "x".join(str(n) for n in summary["shape"])
+    if summary["mean"] is None:
+        return "< {} array >".format(shape)
+    return "< {} array, min {:g}, max {:g}, mean {:g} >".format(
+        shape, summary["min"], summary["max"], summary["mean"]
+    )
+
+
+def _property_repr(p_typ, prop_value):
+    """Return workspace repr of a property value"""
+    if prop_value is _UNKNOWN:
+        return "< unknown >"
+    return _render(prop_value, p_typ)
+
+
+def _has_elements(object):
+    """Return False only if object is known to be an empty container"""
+    try:
+        return bool(object.hasElements())
+    except Exception:
+        return True
+
+
+def _python_row(name, value):
+    """Return workspace row for a Python value like pyzo's dir2 does"""
+    typ = type(value).__name__
+    kind = typ
+    if typ != "type":
+        if hasattr(value, "__array__") and hasattr(value, "dtype"):
+            kind = "array"
+        elif isinstance(value, list):
+            kind = "list"
+        elif isinstance(value, tuple):
+            kind = "tuple"
+
+    # repr
+    if kind == "array":
+        shape = "x".join([str(s) for s in value.shape])
+        rep = "<array {} {}>".format(shape, value.dtype.name)
+    elif kind == "list":
+        rep = "<{}-element list>".format(len(value))
+    elif kind == "tuple":
+        rep = "<{}-element tuple>".format(len(value))
+    else:
+        rep = repr(value)
+        if len(rep) > 80:
+            rep = rep[:77] + "..."
+
+    return [name, typ, kind, rep, "python"]
+
+
+def _python_rows(object, skip=()):
+    """Return workspace rows for the Python namespace of object
+
+    Dictionaries give their keys, sequences their indexes eg. '[0]' and
+    other objects their attributes. Names in skip are not read.
+    """
+    if isinstance(object, dict):
+        items = [(str(key), value) for key, value in object.items()]
+    elif isinstance(object, (list, tuple)):
+        items = [("[{}]".format(i), value) for i, value in enumerate(object)]
+    else:
+        items = None
+
+    rows = []
+    if items is None:
+        try:
+            names = dir(object)
+        except Exception:
+            names = []
+        for name in names:
+            if name.startswith("__") or name in skip:
+                continue
+            try:
+                rows.append(_python_row(name, getattr(object, name)))
+            except Exception as err:
+                if _DEBUG:
+                    print(err)
+    else:
+        for name, value in items:
+            if name.startswith("__") or name in skip:
+                continue
+            rows.append(_python_row(name, value))
+
+    return rows
+
+
+def _schema_key(object):
+    """Return schema cache key for object or None if object is not cacheable
+
+    The key is the implementation name plus the set of supported types.
+    """
+    try:
+        impl = str(object.ImplementationName)
+    except Exception:
+        impl = ""
+    try:
+        types = tuple(sorted(str(t.typeName) for t in object.Types))
+    except Exception:
+        types = ()
+
+    if not impl and not types:
+        return None
+    return impl, types
+
+
+# -----------------------------------------------------------
+#               PROPERTY READER
+# -----------------------------------------------------------
+
+
+class _ReaderThread(threading.Thread):
+    """Daemon helper thread of a PropertyReader
+
+    A daemon thread is not joined at interpreter exit, so a bridge call
+    which never returns does not hang the shutdown of the kernel. busy is
+    True from a submit until its call returns.
+    """
+
+    def __init__(self):
+        threading.Thread.__init__(self, daemon=True)
+        self.busy = False
+        self._calls = queue.Queue()
+        self.start()
+
+    def submit(self, function, args):
+        """Return a Future of function(*args), called in this thread"""
+        future = Future()
+        self.busy = True
+        self._calls.put((future, function, args))
+        return future
+
+    def stop(self):
+        """End the thread after the calls already submitted"""
+        self._calls.put(None)
+
+    def run(self):
+        while True:
+            call = self._calls.get()
+            if call is None:
+                return
+            future, function, args = call
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = function(*args)
+            except BaseException as err:
+                self.busy = False
+                future.set_exception(err)
+            else:
+                self.busy = False
+                future.set_result(result)
+
+
+class PropertyReader:
+    """Read property values with a time budget
+
+    Values are read in a helper thread. If a read is over budget the
+    helper is left to finish it and a new one is started for the next
+    read, so one blocking property does not stall the others. A read
+    never waits behind another call, eg. of a cancelled job, a busy
+    helper is left too, so the budget only counts the read itself.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def read(self, object, name, timeout=None):
+        """Return property value or _UNKNOWN if it can not be read
+
+        :param object: Read property of object
+        :param name: Property name
+        :param timeout: Budget in seconds, None or 0 reads without budget
+
+        Raise concurrent.futures.TimeoutError if the budget is exceeded.
+        """
+        return self.call(getattr, (object, name, _UNKNOWN), timeout)
+
+    def readMany(self, object, names, timeout=None):
+        """Return property values read with one getPropertyValues call
+
+        :param object: Read properties of object, an XMultiPropertySet
+        :param names: Property names
+        :param timeout: Budget in seconds, None or 0 reads without budget
+
+        Raise concurrent.futures.TimeoutError if the budget is exceeded.
+        """
+        return self.call(object.getPropertyValues, (tuple(names),), timeout)
+
+    def call(self, function, args, timeout=None):
+        """Return function(*args), called in the helper with a budget
+
+        Raise concurrent.futures.TimeoutError if the budget is exceeded.
+        """
+        if not timeout:
+            return function(*args)
+
+        with self._lock:
+            thread = self._thread
+            if thread is None or thread.busy:
+                if thread is not None:
+                    # it ends when its call returns
+                    thread.stop()
+                thread = self._thread = _ReaderThread()
+            future = thread.submit(function, args)
+        try:
+            return future.result(timeout)
+        except _Timeout:
+            # the helper is busy until the bridge returns, then it ends
+            with self._lock:
+                if self._thread is thread:
+                    self._thread = None
+            thread.stop()
+            raise
+
+    def close(self):
+        """End the helper thread, a later read starts a new one"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.stop()
+
+
+# -----------------------------------------------------------
+#               CACHES
+# -----------------------------------------------------------
+
+
+class SchemaCache(LRUCache):
+    """Bounded LRU cache of introspection schemas
+
+    The schema of an UNO implementation (property names and types, method
+    signatures and parameter modes) does not change within an office session,
+    so it is fetched from theIntrospection only once per implementation.
+    Keys are made by _schema_key.
+
+    """
+
+    def __init__(self, maxsize=_SCHEMA_CACHE_SIZE):
+        LRUCache.__init__(self, maxsize)
+
+
+class PathCache(LRUCache):
+    """Bounded LRU cache of evaluated object paths
+
+    Keys are tuples of path parts eg. ('doc', 'Sheets', 'getByIndex(0)'),
+    values are the evaluated objects. A drill-down finds its parent here and
+    evaluates only the new part.
+
+    """
+
+    def __init__(self, maxsize=_PATH_CACHE_SIZE):
+        LRUCache.__init__(self, maxsize)
+
+    def discard(self, root):
+        """Remove all paths starting with root
+
+        :param root: first part of the path
+
+        """
+        with self._lock:
+            for key in [key for key in self._data if key[0] == root]:
+                self.pop(key)
+
+
+# shared by all inspectors in this process
+_SCHEMA_CACHE = SchemaCache()
+
+# installed by Inspector.service()
+_SERVICE = None
+
+
 # -----------------------------------------------------------
 #               INSPECTION
 # -----------------------------------------------------------
@@ -70,7 +709,7 @@ class Inspector:
 
     """
 
-    def __init__(self):
+    def __init__(self, cache=None):
 
         try:
             self.ctx = uno.getComponentContext()
@@ -90,160 +729,414 @@ class Inspector:
             "/singletons/com.sun.star.util.theServiceDocumenter"
         )
 
-    def _inspectProperties(self, object):
-        """Inspect properties
+        # introspection schema cache
+        self.cache = _SCHEMA_CACHE if cache is None else cache
 
-        :param object: Inspect properties for object
+        # reads property values with a time budget
+        self.reader = PropertyReader()
+
+    @staticmethod
+    def service():
+        """Return the inspection service of this process
 
+        The service is installed on first use and reused by every request.
+        """
+        global _SERVICE
+        if _SERVICE is None:
+            _SERVICE = InspectionService()
+        return _SERVICE
+
+    def _buildSchema(self, object, engine=_ENGINE):
+        """Build introspection schema
+
+        :param object: Build schema for object
+        :param engine: 'introspection' uses theIntrospection, 'reflection'
+                       the property set info and theCoreReflection classes
+                       of the object types, 'auto' reflection if possible
+
+        Return dict with 'properties' [(name, type), ...],
+        'methods' [(name, return type, parameters, declaring interface), ...],
+        'types' [interface or service name, ...], 'batch' [property read
+        with getPropertyValues, ...] and 'slow' set of properties over the
+        time budget, filled by _inspectProperties
         """
+        types = self._typeNames(object)
+        if engine == "auto":
+            engine = self._autoEngine(types)
+        P, methods = self._members(object, types, engine)
 
-        P = {}
+        M = []
+        for method in methods:
+            m_name = str(method.Name)
+            try:
+                m_typ = str(method.getReturnType().getName())
+                params = _params_to_str(method.ParameterTypes, method.ParameterInfos)
+            except Exception as err:
+                m_typ = "ERROR"
+                params = "< Error method: " + str(err) + " >"
+            try:
+                decl = str(method.getDeclaringClass().getName())
+            except Exception:
+                decl = ""
+            M.append((m_name, m_typ, params, decl))
+
+        return {
+            "properties": P,
+            "methods": M,
+            "types": types,
+            "batch": self._batchNames(object, P, types),
+            "slow": set(),
+        }
+
+    def _members(self, object, types, engine):
+        """List properties and methods with an engine
+
+        :param object: List members of object
+        :param types: Supported type names of object
+        :param engine: 'introspection' or 'reflection'
+
+        Return properties [(name, type), ...] and methods [XIdlMethod, ...]
+        """
+        if engine == "reflection":
+            return self._reflectionMembers(object, types)
+
+        inspector = self.introspection.inspect(object)
+        properties = inspector.getProperties(_PROPERTY_CONCEPT_ALL)
+        methods = inspector.getMethods(_METHOD_CONCEPT_ALL)
+
+        P = []
+        for property in properties:
+            P.append((str(property.Name), str(property.Type.typeName)))
+        return P, list(methods)
+
+    @staticmethod
+    def _autoEngine(types):
+        """Engine for an object with the supported types
+
+        Reflection can list the same members as introspection if the
+        object provides its types and has no dynamic members (XInvocation).
+        Types for which benchmarkEngines found other members use
+        introspection.
+        """
+        checked = _AUTO_ENGINES.get(tuple(types))
+        if checked is not None:
+            return checked
+        if _TYPE_PROVIDER in types and _INVOCATION not in types:
+            return "reflection"
+        return "introspection"
+
+    def _reflectionMembers(self, object, types):
+        """List properties and methods without theIntrospection
+
+        :param object: List members of object
+        :param types: Supported type names of object
+
+        Properties come from the property set info, the interface
+        attributes and the get/is methods without parameters, like
+        introspection does. Methods come from theCoreReflection classes.
+        Return properties [(name, type), ...] and methods [XIdlMethod, ...]
+        """
+        methods = OrderedDict()
+        fields = OrderedDict()
+        for name in types:
+            try:
+                idl = self.reflection.forName(name)
+            except Exception:
+                idl = None
+            # services have no class
+            if idl is None:
+                continue
+            for method in idl.getMethods():
+                methods.setdefault(str(method.Name), method)
+            for field in idl.getFields():
+                fields.setdefault(str(field.Name), field)
+
+        P = OrderedDict()
         try:
-            inspector = self.introspection.inspect(object)
-            properties = inspector.getProperties(_PROPERTY_CONCEPT_ALL)
+            for property in object.getPropertySetInfo().getProperties():
+                P[str(property.Name)] = str(property.Type.typeName)
         except Exception as err:
             if _DEBUG:
                 print(err)
-            return P
 
-        for property in properties:
+        # interface attributes
+        for name, field in fields.items():
+            P.setdefault(name, str(field.getType().getName()))
+
+        # get and is methods
+        for name, method in methods.items():
+            if method.ParameterTypes:
+                continue
+            typ = str(method.getReturnType().getName())
+            if name.startswith("get") and len(name) > 3 and typ != "void":
+                P.setdefault(name[3:], typ)
+            elif name.startswith("is") and len(name) > 2 and typ == "boolean":
+                P.setdefault(name[2:], typ)
 
-            # name
-            p_name = str(property.Name)
+        return list(P.items()), list(methods.values())
+
+    def _batchNames(self, object, properties, types):
+        """Properties which can be read with getPropertyValues
+
+        :param object: Get names for object
+        :param properties: Introspection properties [(name, type), ...]
+        :param types: Supported type names of object
+
+        Return list of names in the property set info of an
+        XMultiPropertySet, other properties are read one by one.
+        """
+        if _MULTI_PROPERTY_SET not in types:
+            return []
+        try:
+            info = object.getPropertySetInfo()
+            names = set(str(p.Name) for p in info.getProperties())
+        except Exception as err:
+            if _DEBUG:
+                print(err)
+            return []
+        return [name for name, typ in properties if name in names]
+
+    def _typeNames(self, object):
+        """Supported services and interfaces with their base interfaces
+
+        :param object: Get type names for object
+
+        Return sorted list of names, used to find the documentation of
+        the members.
+        """
+        names = set()
+        try:
+            names.update(str(name) for name in object.getSupportedServiceNames())
+        except Exception:
+            pass
+
+        try:
+            stack = [str(t.typeName) for t in object.Types]
+        except Exception:
+            stack = []
+        while stack:
+            name = stack.pop()
+            if name in names:
+                continue
+            names.add(name)
             try:
-                P[p_name] = {}
-                # description
-                P[p_name]["desc"] = "uno_property"
+                idl = self.reflection.forName(name)
+                stack.extend(str(c.getName()) for c in idl.getSuperclasses())
+            except Exception:
+                pass
 
-                # type
-                p_typ = str(property.Type.typeName)
+        return sorted(names)
 
-                # repr
-                if hasattr(object, p_name):
-                    prop_value = getattr(object, p_name, None)
-
-                    # tuple
-                    if p_typ.startswith(
-                        ("[]string", "[]type", "[]com", "[][]double")
-                    ):
-                        p_rep = "< tuple with {} elements >".format(
-                            str(len(prop_value))
-                        )
-                    # pyuno object
-                    elif str(prop_value).startswith("pyuno object"):
-                        p_rep = "pyuno object"
-                    # string
-                    elif p_typ == "string":
-                        p_rep = "'{}'".format(prop_value)
-                    # bool
-                    elif p_typ == "boolean" and prop_value == 0:
-                        p_rep = "False"
-                    else:
-                        p_rep = str(prop_value)
-                        p_rep = p_rep.replace("\n", "'\n'")
+    def _getSchema(self, object, engine=_ENGINE):
+        """Get introspection schema from cache or build it
+
+        :param object: Get schema for object
+        :param engine: Inspection engine, see _buildSchema
+
+        Return schema dict or None if object can not be inspected
+        """
+        key = _schema_key(object)
+        if key is not None:
+            key = (engine,) + key
+            schema = self.cache.get(key)
+            if schema is not None:
+                return schema
+
+        try:
+            schema = self._buildSchema(object, engine)
+        except Exception as err:
+            if _DEBUG:
+                print(err)
+            return None
+
+        if key is not None:
+            self.cache.put(key, schema)
+        return schema
+
+    def _inspectProperties(
+        self,
+        object,
+        schema=None,
+        timeout=None,
+        names=None,
+        cancelled=None,
+        values=None,
+        reader=None,
+    ):
+        """Inspect properties
+
+        :param object: Inspect properties for object
+        :param schema: Introspection schema for object
+        :param timeout: Time budget in seconds to read one property
+        :param names: Inspect only these properties
+        :param cancelled: Stop when cancelled() is true
+        :param values: Values read by _readBatch before, {name: value}
+        :param reader: PropertyReader, default the one of the inspector
+
+        A property over the budget is deferred, it is remembered in the
+        schema so it is not read for this implementation again.
+        """
+
+        P = {}
+        if schema is None:
+            schema = self._getSchema(object)
+            if schema is None:
+                return P
+
+        properties = schema["properties"]
+        if names is not None:
+            names = set(names)
+            properties = [p for p in properties if p[0] in names]
+
+        slow = schema["slow"]
+        if reader is None:
+            reader = self.reader
+        if values is None:
+            values = self._readBatch(object, schema, timeout, names, reader)
+        for p_name, p_typ in properties:
+            if cancelled is not None and cancelled():
+                break
+
+            P[p_name] = {}
+            # description
+            P[p_name]["desc"] = "uno_property"
+            P[p_name]["type"] = p_typ.replace("com.sun.star.", "~ ")
+            P[p_name]["items"] = []
+
+            if p_name in slow:
+                P[p_name]["repr"] = _DEFERRED
+                P[p_name]["deferred"] = True
+                continue
+
+            try:
+                if p_name in values:
+                    prop_value = values[p_name]
                 else:
-                    p_rep = "< unknown >"
+                    prop_value = reader.read(object, p_name, timeout)
 
-                p_typ = p_typ.replace("com.sun.star.", "~ ")
+                summary = _summarize(prop_value, p_typ)
+                if summary is None:
+                    P[p_name]["repr"] = _property_repr(p_typ, prop_value)
+                else:
+                    P[p_name]["repr"] = _summary_repr(summary)
+                    P[p_name]["summary"] = summary
 
-                P[p_name]["type"] = p_typ
-                P[p_name]["repr"] = (p_rep[:120] + "..") if len(p_rep) > 120 else p_rep
-                P[p_name]["items"] = []
+            except _Timeout:
+                slow.add(p_name)
+                P[p_name]["repr"] = _DEFERRED
+                P[p_name]["deferred"] = True
 
             except Exception as err:
-                P[p_name]["type"] = p_typ
                 P[p_name]["repr"] = "< Error property: " + str(err) + " >"
-                P[p_name]["items"] = []
 
         return P
 
-    def _inspectMethods(self, object):
+    def _readBatch(self, object, schema, timeout=None, names=None, reader=None):
+        """Read property values in as few bridge calls as possible
+
+        :param object: Read properties of object
+        :param schema: Introspection schema for object
+        :param timeout: Time budget in seconds to read one property
+        :param names: Read only these properties
+        :param reader: PropertyReader, default the one of the inspector
+
+        Return dict {name: value}. A failed batch is split in halves, so
+        only the names which fail are left out and read one by one by
+        _inspectProperties. After a timeout the rest is left out.
+        """
+        slow = schema["slow"]
+        if reader is None:
+            reader = self.reader
+        wanted = names
+        names = []
+        for name in schema.get("batch", ()):
+            if name not in slow and (wanted is None or name in wanted):
+                names.append(name)
+        if timeout:
+            timeout = timeout * _BATCH_TIMEOUT_FACTOR
+
+        values = {}
+        batches = [names] if names else []
+        while batches:
+            batch = batches.pop()
+            try:
+                batch_values = reader.readMany(object, batch, timeout)
+            except _Timeout:
+                break
+            except Exception as err:
+                if _DEBUG:
+                    print(err)
+                if len(batch) > 1:
+                    half = len(batch) // 2
+                    batches.extend((batch[:half], batch[half:]))
+                continue
+            values.update(zip(batch, batch_values))
+
+        return values
+
+    def readProperty(self, object, name, engine=_ENGINE):
+        """Read one property without time budget, eg. a deferred one
+
+        :param object: Read property of object
+        :param name: Property name
+        :param engine: Inspection engine, see _buildSchema
+
+        Return workspace row [name, type, kind, repr, desc] or None
+        """
+        schema = self._getSchema(object, engine)
+        if schema is None:
+            return None
+
+        for p_name, p_typ in schema["properties"]:
+            if p_name == name:
+                try:
+                    p_rep = _property_repr(p_typ, getattr(object, name, _UNKNOWN))
+                except Exception as err:
+                    p_rep = "< Error property: " + str(err) + " >"
+                typ = p_typ.replace("com.sun.star.", "~ ")
+                return [name, typ, "uno_property", p_rep, "uno_property"]
+
+        return None
+
+    def _inspectMethods(self, object, schema=None):
         """Inspect methods
 
         :param object: Inspect methods for object
+        :param schema: Introspection schema for object
 
         """
 
         M = {}
-        m_name = "ERROR"
-        try:
-            inspector = self.introspection.inspect(object)
-            methods = inspector.getMethods(_METHOD_CONCEPT_ALL)
-        except Exception as err:
-            if _DEBUG:
-                print(err)
-            return M
+        if schema is None:
+            schema = self._getSchema(object)
+            if schema is None:
+                return M
 
-        for method in methods:
-            # name
-            m_name = str(method.Name)
+        has_elements = None
+        for m_name, m_typ, params, decl in schema["methods"]:
             try:
                 M[m_name] = {}
                 # description
                 M[m_name]["desc"] = "uno_method"
+                # declaring interface
+                M[m_name]["decl"] = decl
                 # type
-                m_typ = str(method.getReturnType().getName())
-                m_typ = m_typ.replace("com.sun.star.", "~ ")
-                M[m_name]["type"] = m_typ
-
-                all_items = []
-                # name access
-                if m_name == "getByName":
-                    # if hasattr(object, 'getElementNames'):
-                    items = object.getElementNames()
-                    # escape bytes
-                    for item in items:
-                        all_items.append(str(item))
-                    M[m_name]["items"] = sorted(all_items)
-
-                # index access
-                elif m_name == "getByIndex":
-                    # if hasattr(object, 'getCount'):
-                    items = object.getCount()
-                    M[m_name]["items"] = [str(item) for item in range(0, items)]
-
-                # supported services
-                elif m_name == "getSupportedServiceNames":
-                    items = object.getSupportedServiceNames()
-                    M[m_name]["items"] = sorted(items)
-
-                # enumerate
-                elif m_name == "createEnumeration":
-                    enm = object.createEnumeration()
-                    e = 0
-                    while enm.hasMoreElements():
-                        value = enm.nextElement()
-                        all_items.append(str(e))
-                        e = e + 1
-                    M[m_name]["items"] = sorted(all_items)
-                else:
-                    # pass
-                    M[m_name]["items"] = all_items
-
+                M[m_name]["type"] = m_typ.replace("com.sun.star.", "~ ")
                 # repr
-                args = method.ParameterTypes
-                infos = method.ParameterInfos
-
-                params = "( "
-                for i in range(0, len(args)):
-
-                    params = (
-                        params
-                        + _mode_to_str(infos[i].aMode)
-                        + " "
-                        + str(args[i].Name)
-                        + " "
-                        + str(infos[i].aName)
-                        + ", "
-                    )
-
-                params = params + ")"
-                params = params.replace(", )", " )")
+                M[m_name]["repr"] = params
+                M[m_name]["items"] = []
 
-                # if params == "()":
-                #     params = "()"
+                # container flags, elements are read on demand
+                # with inspectContainer
+                if m_typ == "ERROR":
+                    pass
+                elif m_name in _CONTAINER_METHODS:
+                    if has_elements is None:
+                        has_elements = _has_elements(object)
+                    M[m_name]["container"] = has_elements
+                elif m_name == "getSupportedServiceNames":
+                    M[m_name]["container"] = True
 
-                M[m_name]["repr"] = str(params)
             except Exception as err:
                 # M[m_name] = {}
                 M[m_name]["type"] = "ERROR"
@@ -252,6 +1145,62 @@ class Inspector:
 
         return M
 
+    def inspectContainer(self, object, method, start=0, count=_PAGE_SIZE):
+        """Inspect a window of container elements
+
+        :param object: Inspect elements for object
+        :param method: 'getByName', 'getByIndex', 'createEnumeration'
+                       or 'getSupportedServiceNames'
+        :param start: first element of the window
+        :param count: number of elements in the window
+
+        Return dict with 'start', 'count' (all elements, None if unknown),
+        'more' (elements after the window) and 'items' (names or indexes
+        in the window). Only the window is materialised.
+        """
+        start = max(0, int(start))
+        stop = start + max(1, int(count))
+        page = {"start": start, "count": 0, "more": False, "items": []}
+        try:
+            # name access
+            if method == "getByName":
+                # escape bytes
+                names = sorted(str(item) for item in object.getElementNames())
+                page["count"] = len(names)
+                page["items"] = names[start:stop]
+
+            # index access
+            elif method == "getByIndex":
+                n = object.getCount()
+                page["count"] = n
+                page["items"] = [str(item) for item in range(start, min(stop, n))]
+
+            # supported services
+            elif method == "getSupportedServiceNames":
+                names = sorted(object.getSupportedServiceNames())
+                page["count"] = len(names)
+                page["items"] = names[start:stop]
+
+            # enumerate, walk only up to the end of the window
+            elif method == "createEnumeration":
+                page["count"] = None
+                enm = object.createEnumeration()
+                e = 0
+                while e < stop and enm.hasMoreElements():
+                    enm.nextElement()
+                    if e >= start:
+                        page["items"].append(str(e))
+                    e = e + 1
+                page["more"] = bool(enm.hasMoreElements())
+
+        except Exception as err:
+            if _DEBUG:
+                print(err)
+
+        if page["count"]:
+            page["more"] = stop < page["count"]
+        return page
+
     def _inspectPython(self, object):
 
         """Inspect standard Python
@@ -326,6 +1275,158 @@ class Inspector:
 
         return V
 
+    def _inspectUNO(self, object, schema=None, timeout=None):
+        """Inspect UNO properties and methods or a sequence of UNO values
+
+        :param object: Inspect this object
+        :param schema: Introspection schema for object
+        :param timeout: Time budget in seconds to read one property
+
+        """
+        context = {}
+
+        # inspect UNO properties and methods, the schema is cached
+        # per implementation so only live values are fetched here
+        if schema is None:
+            schema = self._getSchema(object)
+        if schema is not None:
+            p = self._inspectProperties(object, schema, timeout)
+            m = self._inspectMethods(object, schema)
+        else:
+            p = m = {}
+
+        # UNO object
+        if p and m:
+            context.update(sorted(p.items()))
+            context.update(sorted(m.items()))
+        else:
+            v = self._inspectPropertyValue(object)
+            if v:
+                context.update(sorted(v.items()))
+
+        return context
+
+    def members(self, object, uno=True, timeout=_PROPERTY_TIMEOUT, engine=_ENGINE):
+        """Inspect Python and UNO members in one pass
+
+        :param object: Inspect members of this object
+        :param uno: Inspect UNO properties and methods
+        :param timeout: Time budget in seconds to read one property
+        :param engine: Inspection engine, see _buildSchema
+
+        Return dict with 'rows' [[name, type, kind, repr, desc], ...] ready
+        for the workspace tree, 'containers' {method: has elements},
+        'decl' {method: declaring interface}, 'types' [supported
+        interface or service name, ...] to find the documentation,
+        'deferred' [property over the time budget, ...] and 'summaries'
+        {property: numeric summary}, see _summarize.
+        Python attributes which are UNO members are not read again.
+        """
+        schema = self._getSchema(object, engine) if uno else None
+        context = self._inspectUNO(object, schema, timeout) if uno else {}
+        types = schema.get("types", []) if schema is not None else []
+        return self._payload(context, _python_rows(object, context), types)
+
+    def memberChunks(
+        self,
+        object,
+        uno=True,
+        timeout=_PROPERTY_TIMEOUT,
+        engine=_ENGINE,
+        size=_CHUNK_SIZE,
+        cancelled=None,
+        reader=None,
+    ):
+        """Inspect members in chunks, for a background inspection
+
+        :param object: Inspect members of this object
+        :param uno: Inspect UNO properties and methods
+        :param timeout: Time budget in seconds to read one property
+        :param engine: Inspection engine, see _buildSchema
+        :param size: Number of property values per chunk
+        :param cancelled: Stop when cancelled() is true
+        :param reader: PropertyReader, default the one of the inspector
+
+        Yield members payloads, see members. The first has the names and
+        types of all UNO members (property values are '...'), the next the
+        values of size properties each and the last the Python attributes.
+        Rows of a later chunk replace rows of the same name. The values
+        are read with one getPropertyValues call before the first value
+        chunk, see _readBatch.
+        """
+        schema = self._getSchema(object, engine) if uno else None
+        if schema is None or not (schema["properties"] and schema["methods"]):
+            # not an UNO object, nothing to wait for
+            yield self.members(object, uno, timeout, engine)
+            return
+
+        # names and types
+        context = OrderedDict()
+        for p_name, p_typ in sorted(schema["properties"]):
+            context[p_name] = {
+                "desc": "uno_property",
+                "type": p_typ.replace("com.sun.star.", "~ "),
+                "repr": _PENDING,
+            }
+        context.update(sorted(self._inspectMethods(object, schema).items()))
+        yield self._payload(context, types=schema["types"])
+
+        # values, the batch is read once for all chunks
+        if cancelled is not None and cancelled():
+            return
+        values = self._readBatch(object, schema, timeout, reader=reader)
+        names = sorted(p[0] for p in schema["properties"])
+        for i in range(0, len(names), size):
+            if cancelled is not None and cancelled():
+                return
+            P = self._inspectProperties(
+                object,
+                schema,
+                timeout,
+                names[i : i + size],
+                cancelled,
+                values,
+                reader,
+            )
+            yield self._payload(OrderedDict(sorted(P.items())))
+
+        # Python attributes
+        if cancelled is None or not cancelled():
+            yield self._payload({}, _python_rows(object, context))
+
+    @staticmethod
+    def _payload(context, rows=(), types=()):
+        """Return members payload of inspected members, see members
+
+        :param context: UNO members {name: {'type', 'desc', 'repr', ...}}
+        :param rows: Python rows [[name, type, kind, repr, desc], ...]
+        :param types: Supported interface or service names
+
+        """
+        payload = {
+            "rows": [],
+            "containers": {},
+            "decl": {},
+            "types": list(types),
+            "deferred": [],
+            "summaries": {},
+        }
+        for name, value in context.items():
+            payload["rows"].append(
+                [name, value["type"], value["desc"], value["repr"], value["desc"]]
+            )
+            if "container" in value:
+                payload["containers"][name] = value["container"]
+            if value.get("decl"):
+                payload["decl"][name] = value["decl"]
+            if value.get("deferred"):
+                payload["deferred"].append(name)
+            if "summary" in value:
+                payload["summaries"][name] = value["summary"]
+
+        payload["rows"].extend(rows)
+        return payload
+
     def inspect(self, object, output="json"):
         """Inspect object
         :param object:  Inspect this object
@@ -342,18 +1443,7 @@ class Inspector:
         if object is None:
             return context
         else:
-            # inspect UNO properties and methods
-            p = self._inspectProperties(object)
-            m = self._inspectMethods(object)
-
-            # UNO object
-            if p and m:
-                context.update(sorted(p.items()))
-                context.update(sorted(m.items()))
-            else:
-                v = self._inspectPropertyValue(object)
-                if v:
-                    context.update(sorted(v.items()))
+            context = self._inspectUNO(object)
 
             # not UNO object - try python
             if not context:
@@ -415,3 +1505,636 @@ class Inspector:
 
         return pathJSON, pathPICKLE
 
+
+# -----------------------------------------------------------
+#               INSPECTION SERVICE
+# -----------------------------------------------------------
+
+
+class InspectionJob:
+    """Background inspection
+
+    A worker thread puts the chunks of chunks(cancelled), a generator, in
+    a queue, the workspace polls them. A cancelled job stops before its
+    next chunk or property, so stale work stops using the bridge. A job
+    which fails puts a chunk {'error': message} last.
+
+    """
+
+    def __init__(self, job_id, chunks):
+        self.id = job_id
+        self._chunks = chunks
+        self._queue = queue.Queue()
+        self._cancelled = threading.Event()
+        self.done = False
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for chunk in self._chunks(self.cancelled):
+                if self.cancelled():
+                    break
+                self._queue.put(chunk)
+        except Exception as err:
+            if _DEBUG:
+                print(err)
+            self._queue.put({"error": str(err)})
+        finally:
+            # end of job
+            self._queue.put(None)
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop the job"""
+        self._cancelled.set()
+
+    def poll(self, wait=_POLL_WAIT):
+        """Return the chunks ready within wait seconds
+
+        :param wait: Seconds to wait for the first chunk
+
+        """
+        chunks = []
+        if self.done:
+            return chunks
+        try:
+            if wait:
+                chunk = self._queue.get(timeout=wait)
+            else:
+                chunk = self._queue.get_nowait()
+            while True:
+                if chunk is None:
+                    self.done = True
+                    break
+                chunks.append(chunk)
+                chunk = self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        return chunks
+
+
+class PropertyWatch(unohelper.Base, XPropertyChangeListener, XModifyListener):
+    """Live property watch
+
+    Listens to the bound properties of the object and to modifications of
+    the document. A worker thread polls the other properties, less often
+    while they do not change, and at once when the document is modified.
+    Changed rows are kept until the workspace takes them.
+
+    The polls use their own PropertyReader and their own set of slow
+    properties, so they do not delay the reads of the shell, and a poll
+    over the budget does not defer the property in the shared schema.
+
+    """
+
+    def __init__(
+        self,
+        watch_id,
+        inspector,
+        object,
+        document=None,
+        engine=_ENGINE,
+        timeout=_PROPERTY_TIMEOUT,
+    ):
+        self.id = watch_id
+        self.object = object
+        self.events = 0
+        self.polls = 0
+        self._inspector = inspector
+        self._timeout = timeout
+        self._reader = PropertyReader()
+        schema = inspector._getSchema(object, engine)
+        if schema is not None:
+            # the shared schema is only read
+            schema = dict(schema, slow=set(schema["slow"]))
+        self._schema = schema
+        self._types = dict(self._schema["properties"]) if self._schema else {}
+        self._values = {}
+        self._changes = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+        self._listened = []
+        bound = self._listen(self._boundNames())
+        self._polled = [name for name in self._types if name not in bound]
+
+        self._document = None
+        if document is not None:
+            try:
+                document.addModifyListener(self)
+                self._document = document
+            except Exception as err:
+                if _DEBUG:
+                    print(err)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _boundNames(self):
+        """Return names of the properties which broadcast changes
+        """
+        try:
+            properties = self.object.getPropertySetInfo().getProperties()
+        except Exception:
+            return set()
+        names = set()
+        for property in properties:
+            if property.Attributes & _BOUND and property.Name in self._types:
+                names.add(str(property.Name))
+        return names
+
+    def _listen(self, names):
+        """Add the listener for properties, return names listened to
+
+        :param names: Names of bound properties
+
+        An empty name adds it for all bound properties, if the object does
+        not support that it is added for each name.
+        """
+        if not names:
+            return set()
+        try:
+            self.object.addPropertyChangeListener("", self)
+            self._listened = [""]
+            return names
+        except Exception:
+            pass
+        listened = set()
+        for name in names:
+            try:
+                self.object.addPropertyChangeListener(name, self)
+                listened.add(name)
+            except Exception:
+                pass
+        self._listened = sorted(listened)
+        return listened
+
+    def _run(self):
+        # values when the watch starts are not changes
+        self._poll(report=False)
+        interval = _WATCH_INTERVAL[0]
+        while not self._stopped.is_set():
+            woken = self._wake.wait(interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            if self._poll() or woken:
+                interval = _WATCH_INTERVAL[0]
+            else:
+                interval = min(interval * 2, _WATCH_INTERVAL[1])
+        # the last poll has returned
+        self._reader.close()
+
+    def _poll(self, report=True):
+        """Read the polled properties, return True if any changed
+        """
+        slow = self._schema["slow"] if self._schema else ()
+        names = [name for name in self._polled if name not in slow]
+        if not names:
+            return False
+        self.polls += 1
+        try:
+            P = self._inspector._inspectProperties(
+                self.object,
+                self._schema,
+                self._timeout,
+                names,
+                self._stopped.is_set,
+                reader=self._reader,
+            )
+        except Exception as err:
+            if _DEBUG:
+                print(err)
+            return False
+        changed = False
+        for name, info in P.items():
+            if not info.get("deferred"):
+                changed = self._update(name, info["repr"], report) or changed
+        return changed
+
+    def _update(self, name, rep, report=True):
+        """Remember a value repr, return True if it changed
+        """
+        with self._lock:
+            if name in self._values and self._values[name] == rep:
+                return False
+            self._values[name] = rep
+            if report:
+                self._changes[name] = rep
+        return report
+
+    # XPropertyChangeListener
+    def propertyChange(self, event):
+        name = str(event.PropertyName)
+        p_typ = self._types.get(name)
+        if p_typ is None:
+            return
+        self.events += 1
+        try:
+            summary = _summarize(event.NewValue, p_typ)
+            if summary is None:
+                rep = _property_repr(p_typ, event.NewValue)
+            else:
+                rep = _summary_repr(summary)
+        except Exception as err:
+            rep = "< Error property: " + str(err) + " >"
+        self._update(name, rep)
+
+    # XModifyListener
+    def modified(self, event):
+        self.events += 1
+        self._wake.set()
+
+    # XEventListener
+    def disposing(self, event):
+        self._stopped.set()
+        self._wake.set()
+
+    def active(self):
+        return not self._stopped.is_set()
+
+    def take(self):
+        """Return rows [name, type, kind, repr, desc] changed since the
+        last call
+        """
+        with self._lock:
+            changes, self._changes = self._changes, OrderedDict()
+        rows = []
+        for name, rep in changes.items():
+            typ = self._types[name].replace("com.sun.star.", "~ ")
+            rows.append([name, typ, "uno_property", rep, "uno_property"])
+        return rows
+
+    def stop(self):
+        """Stop polling and remove the listeners
+        """
+        self._stopped.set()
+        self._wake.set()
+        for name in self._listened:
+            try:
+                self.object.removePropertyChangeListener(name, self)
+            except Exception:
+                pass
+        self._listened = []
+        if self._document is not None:
+            try:
+                self._document.removeModifyListener(self)
+            except Exception:
+                pass
+            self._document = None
+
+    def stats(self):
+        return {
+            "listened": len(self._types) - len(self._polled),
+            "polled": len(self._polled),
+            "events": self.events,
+            "polls": self.polls,
+        }
+
+
+class InspectionService:
+    """Long-lived inspection service
+
+    One service is installed per kernel (see Inspector.service) and used by
+    the PyUNO Workspace for every request. It keeps one Inspector, so the
+    singleton lookups and the caches survive between requests, and builds a
+    new one with empty caches when an inspected object or the services are
+    disposed, eg. after the office was closed or reconnected.
+
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.restarts = 0
+        self.ctx = None
+        self._inspector = None
+        self.paths = PathCache()
+        # background inspection
+        self._job = None
+        self._job_id = 0
+        # live property watch
+        self._watch = None
+        self._watch_id = 0
+
+    def _disposed(self):
+        """Return True if the services of the inspector are disposed
+        """
+        if self._inspector is None:
+            return False
+        try:
+            self.ctx.getServiceManager()
+            self._inspector.introspection.getTypes()
+        except Exception as err:
+            if _DEBUG:
+                print(err)
+            return True
+        return False
+
+    def reset(self):
+        """Drop the inspector and its caches, next request builds a new one
+        """
+        self._inspector = None
+        self.ctx = None
+        self.paths.clear()
+        _SCHEMA_CACHE.clear()
+
+    def getInspector(self):
+        """Return the inspector, build it on first use or after a reset
+        """
+        if self._inspector is None:
+            self.reset()
+            self._inspector = Inspector()
+            self.ctx = self._inspector.ctx
+        return self._inspector
+
+    def _call(self, method, *args):
+        """Call inspector method, retry once with a new inspector and empty
+        caches if an object or the introspection services are disposed
+
+        Other errors are raised.
+        """
+        self.requests += 1
+        try:
+            return getattr(self.getInspector(), method)(*args)
+        except (DisposedException, RuntimeException) as err:
+            if _DEBUG:
+                print(err)
+            if not (isinstance(err, DisposedException) or self._disposed()):
+                raise
+            self.restarts += 1
+            self.reset()
+            return getattr(self.getInspector(), method)(*args)
+
+    def invalidate(self):
+        """Forget all evaluated paths, eg. on refresh
+        """
+        self.paths.clear()
+
+    def _evaluatePart(self, parent, part, namespace, first):
+        """Evaluate one path part
+
+        :param parent: object evaluated from the previous parts
+        :param part: path part eg. 'Sheets', 'getByIndex(0)' or '[2]'
+        :param namespace: namespace for names used in the part
+        :param first: part is the root of the path
+
+        """
+        if first:
+            expression = part
+        elif part.startswith("["):
+            expression = _PARENT + part
+        else:
+            expression = _PARENT + "." + part
+
+        scope = ChainMap({_PARENT: parent}, namespace)
+        return eval(expression, {"__builtins__": builtins}, scope)
+
+    def evaluate(self, path, namespace):
+        """Evaluate object path, reuse cached intermediate objects
+
+        :param path: list of path parts eg. ['doc', 'Sheets', 'getByIndex(0)']
+        :param namespace: namespace of the shell, locals() in eval request
+
+        Only the parts after the longest cached strict prefix are
+        evaluated. The last part is always evaluated, so a name shown
+        again, eg. getCurrentSelection(), gives the current object.
+        """
+        path = tuple(path)
+        if not path:
+            return None
+
+        # the root name was rebound in the shell
+        root = path[0]
+        if root.isidentifier() and (root,) in self.paths:
+            current = self._evaluatePart(None, root, namespace, True)
+            if current is not self.paths.peek((root,)):
+                self.paths.discard(root)
+
+        # longest cached strict prefix
+        n = len(path) - 1
+        while n and path[:n] not in self.paths:
+            n -= 1
+        if n:
+            object = self.paths.get(path[:n])
+        else:
+            object = None
+            self.paths.misses += 1
+
+        for i in range(n, len(path)):
+            object = self._evaluatePart(object, path[i], namespace, i == 0)
+            self.paths.put(path[: i + 1], object)
+
+        return object
+
+    def inspect(self, object, output="dict"):
+        """Inspect object, see Inspector.inspect
+        """
+        return self._call("inspect", object, output)
+
+    def members(self, object, uno=True, timeout=_PROPERTY_TIMEOUT, engine=_ENGINE):
+        """Inspect Python and UNO members, see Inspector.members
+        """
+        return self._call("members", object, uno, timeout, engine)
+
+    def readProperty(self, object, name, engine=_ENGINE):
+        """Read one property, see Inspector.readProperty
+        """
+        return self._call("readProperty", object, name, engine)
+
+    def start(
+        self,
+        object,
+        uno=True,
+        timeout=_PROPERTY_TIMEOUT,
+        engine=_ENGINE,
+        size=_CHUNK_SIZE,
+        wait=_POLL_WAIT,
+    ):
+        """Start a background inspection of members, cancel the previous one
+
+        :param object: Inspect members of this object
+        :param wait: Seconds to wait for the first chunk
+        other parameters see Inspector.memberChunks
+
+        Return the first poll, see poll
+        """
+        self.cancel()
+        # the watch is kept, a refresh evaluates the path again and may
+        # give a new proxy of the same object; the workspace stops the
+        # watch when its name changes
+        self.requests += 1
+        self._job_id += 1
+        inspector = self.getInspector()
+
+        def chunks(cancelled):
+            # own reader, the reads of a cancelled job do not delay the
+            # reads of the next one
+            reader = PropertyReader()
+            try:
+                yield from inspector.memberChunks(
+                    object, uno, timeout, engine, size, cancelled, reader
+                )
+            finally:
+                reader.close()
+
+        self._job = InspectionJob(self._job_id, chunks)
+        return self.poll(self._job_id, wait)
+
+    def poll(self, job_id, wait=_POLL_WAIT):
+        """Return chunks of a background inspection
+
+        :param job_id: Job id returned by start
+        :param wait: Seconds to wait for the next chunk
+
+        Return dict with 'job' id, 'chunks' [members payload, ...] and
+        'done' True if no more chunks follow.
+        """
+        job = self._job
+        if job is None or job.id != job_id:
+            # cancelled by a newer job
+            return {"job": job_id, "chunks": [], "done": True}
+        chunks = job.poll(wait)
+        return {"job": job_id, "chunks": chunks, "done": job.done}
+
+    def cancel(self):
+        """Cancel the background inspection
+        """
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def watch(self, object, root=(), engine=_ENGINE, timeout=_PROPERTY_TIMEOUT):
+        """Watch properties of object, stop the previous watch
+
+        :param object: Watch properties of this object
+        :param root: Path of the document, eg. ['doc'], taken from the path
+                     cache, it is watched for modifications
+        other parameters see Inspector.members
+
+        Return dict with 'watch' id and watch stats
+        """
+        self.unwatch()
+        self.requests += 1
+        self._watch_id += 1
+        document = self.paths.peek(tuple(root)) if root else None
+        if document is not None and not hasattr(document, "addModifyListener"):
+            document = None
+        self._watch = PropertyWatch(
+            self._watch_id, self.getInspector(), object, document, engine, timeout
+        )
+        return dict(self._watch.stats(), watch=self._watch_id)
+
+    def changes(self, watch_id):
+        """Return changes of a watch
+
+        :param watch_id: Watch id returned by watch
+
+        Return dict with 'watch' id, 'rows' [[name, type, kind, repr,
+        desc], ...] changed since the last call and 'active' False if the
+        watch was stopped or the object disposed.
+        """
+        watch = self._watch
+        if watch is None or watch.id != watch_id:
+            return {"watch": watch_id, "rows": [], "active": False}
+        return {"watch": watch_id, "rows": watch.take(), "active": watch.active()}
+
+    def unwatch(self):
+        """Stop the watch
+        """
+        if self._watch is not None:
+            self._watch.stop()
+            self._watch = None
+
+    def inspectContainer(self, object, method, start=0, count=_PAGE_SIZE):
+        """Inspect a window of container elements, see Inspector.inspectContainer
+        """
+        return self._call("inspectContainer", object, method, start, count)
+
+    def stats(self):
+        """Return service uptime and cache statistics
+        """
+        return {
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "restarts": self.restarts,
+            "schema_cache": _SCHEMA_CACHE.stats(),
+            "path_cache": self.paths.stats(),
+            "watch": self._watch.stats() if self._watch is not None else None,
+        }
+
+
+# -----------------------------------------------------------
+#               BENCHMARK
+# -----------------------------------------------------------
+
+
+def benchmarkEngines(objects, repeat=3):
+    """Compare the inspection engines on some objects
+
+    :param objects: dict {label: object}, eg. a document, a sheet, a cell
+    :param repeat: number of schema builds per engine, the best is kept
+
+    Schemas are built without cache. The engine of 'auto' is remembered
+    for the types of each object. Print a table and return dict
+    {label: {'introspection': seconds, 'reflection': seconds,
+    'auto': engine chosen by 'auto', 'missing': [member only in
+    introspection, ...], 'extra': [member only in reflection, ...]}}.
+    'auto' chooses reflection only if nothing is missing or extra.
+    """
+    inspector = Inspector.service().getInspector()
+
+    result = {}
+    for label, object in objects.items():
+        row = {}
+        members = {}
+        for engine in ("introspection", "reflection"):
+            best = None
+            for i in range(repeat):
+                start = time.perf_counter()
+                schema = inspector._buildSchema(object, engine)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            row[engine] = best
+            members[engine] = set(p[0] for p in schema["properties"]) | set(
+                m[0] for m in schema["methods"]
+            )
+        row["missing"] = sorted(members["introspection"] - members["reflection"])
+        row["extra"] = sorted(members["reflection"] - members["introspection"])
+        # 'auto' uses reflection for these types only if it lists the
+        # same members
+        types = inspector._typeNames(object)
+        _AUTO_ENGINES.pop(tuple(types), None)
+        row["auto"] = inspector._autoEngine(types)
+        if row["missing"] or row["extra"]:
+            row["auto"] = "introspection"
+        _AUTO_ENGINES[tuple(types)] = row["auto"]
+        key = _schema_key(object)
+        if key is not None:
+            # built with the engine chosen before
+            _SCHEMA_CACHE.pop(("auto",) + key)
+        result[label] = row
+
+    print(
+        "{:<20}{:>15}{:>15}{:>15}{:>10}{:>10}".format(
+            "object", "introspection", "reflection", "auto", "missing", "extra"
+        )
+    )
+    for label, row in result.items():
+        print(
+            "{:<20}{:>13.1f}ms{:>13.1f}ms{:>15}{:>10}{:>10}".format(
+                label,
+                row["introspection"] * 1000,
+                row["reflection"] * 1000,
+                row["auto"],
+                len(row["missing"]),
+                len(row["extra"]),
+            )
+        )
+
+    return result
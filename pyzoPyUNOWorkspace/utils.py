@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 # PyUNO Workspace helper module
+from collections import OrderedDict
 from re import findall
 from os.path import join
+import threading
 
 
 def splitName(name):
@@ -51,6 +53,50 @@ def splitNameCleaner(name):
     return np
 
 
+def splitPath(name):
+    """ splitPath(name)
+    Split an object name in evaluable parts, taking dots, quotes, brackets
+    and indexing into account, eg. 'list(doc.Text)[0].getByName("a.b")'
+    gives ['list(doc.Text)', '[0]', 'getByName("a.b")'].
+    joinName(splitPath(name)) gives the name back.
+    A name with operators at the top level is not split.
+    """
+    parts = []
+    part = ""
+    depth = 0
+    quote = ""
+
+    for c in name:
+        if quote:
+            part += c
+            if c == quote:
+                quote = ""
+            continue
+
+        if c in "\"'":
+            quote = c
+        elif c in "([{":
+            if c == "[" and depth == 0 and part:
+                parts.append(part)
+                part = ""
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        elif depth == 0:
+            if c == ".":
+                if part:
+                    parts.append(part)
+                part = ""
+                continue
+            elif not (c.isalnum() or c == "_"):
+                return [name] if name else []
+        part += c
+
+    if part:
+        parts.append(part)
+    return parts
+
+
 def joinName(parts):
     """ joinName(parts)
     Join the parts of an object name, taking dots and indexing into account.
@@ -58,3 +104,116 @@ def joinName(parts):
 
     name = ".".join(parts)
     return name.replace(".[", "[")
+
+
+class LRUCache:
+    """ LRUCache
+
+    Bounded LRU cache with hit/miss counters. It is used by the workspace
+    (rendered help, snapshots) and by the inspection service in the shell
+    (schemas, evaluated paths), where background threads share it, so the
+    updates are locked.
+
+    Each entry weighs weigh(value), 1 by default, the least recently used
+    entries are dropped while the total weight exceeds maxsize.
+
+    """
+
+    def __init__(self, maxsize, weigh=None):
+        self.maxsize = maxsize
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._weigh = weigh
+        self._data = OrderedDict()
+        self._weights = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """ get(key, default=None)
+        Return the cached value or default, and count the lookup.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        """ peek(key, default=None)
+        Return the cached value or default, do not count or reorder.
+        """
+        return self._data.get(key, default)
+
+    def put(self, key, value):
+        """ put(key, value)
+        Store value, evict the least recently used entries. A value
+        heavier than maxsize is not stored.
+        """
+        weight = 1 if self._weigh is None else self._weigh(value)
+        with self._lock:
+            self.pop(key)
+            if weight > self.maxsize:
+                return
+            self._data[key] = value
+            self._weights[key] = weight
+            self.weight += weight
+            self.shrink()
+
+    def pop(self, key, default=None):
+        """ pop(key, default=None)
+        Remove key, return its value or default.
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            self.weight -= self._weights.pop(key)
+            return self._data.pop(key)
+
+    def shrink(self):
+        """ shrink()
+        Evict the least recently used entries until the weight fits.
+        """
+        with self._lock:
+            while self._data and self.weight > self.maxsize:
+                key, value = self._data.popitem(last=False)
+                self.weight -= self._weights.pop(key)
+
+    def setMaxsize(self, maxsize):
+        """ setMaxsize(maxsize)
+        Change the bound and evict what does not fit.
+        """
+        self.maxsize = maxsize
+        self.shrink()
+
+    def clear(self):
+        """ clear()
+        Remove all entries and reset the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """ stats()
+        Return size, maxsize, hits and misses.
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }